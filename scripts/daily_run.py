@@ -1,23 +1,28 @@
 #!/usr/bin/env python3
 """Daily SENTINEL run: fetch data, analyze, predict, report."""
 
-import json
 import logging
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
+import orjson
+
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.data.fetcher import ALL_TICKERS, US_STOCKS, fetch_prices
-from src.analysis.technical import generate_signals
+from src.analysis.technical import generate_signals_batch
 from src.analysis.predictor import blind_predict
 from src.delivery.discord_report import daily_market_summary, prediction_report
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
 logger = logging.getLogger(__name__)
 
+# Per-ticker predictions are I/O bound (yfinance) or NumPy work that releases the GIL
+MAX_WORKERS = 8
+
 
 def main():
     today = datetime.now().strftime("%Y-%m-%d")
@@ -29,25 +34,20 @@ def main():
 
     # 2. Technical analysis for US stocks
     logger.info("Running technical analysis...")
-    analyses = {}
-    for ticker in US_STOCKS:
-        try:
-            if ticker in prices.columns.get_level_values(0):
-                df = prices[ticker].dropna()
-                if not df.empty:
-                    signals = generate_signals(df)
-                    analyses[ticker] = signals
-                    logger.info(f"{ticker}: {signals.get('overall', {}).get('signal', 'N/A')}")
-        except Exception as e:
-            logger.error(f"Analysis failed for {ticker}: {e}")
+    try:
+        analyses = generate_signals_batch(prices, US_STOCKS) if not prices.empty else {}
+    except Exception as e:
+        logger.error(f"Technical analysis failed: {e}")
+        analyses = {}
+    for ticker, signals in analyses.items():
+        logger.info(f"{ticker}: {signals.get('overall', {}).get('signal', 'N/A')}")
 
     # 3. Generate predictions
     logger.info("Generating predictions...")
     prediction_tickers = US_STOCKS + ["BTC-USD", "^GSPC"]
-    predictions = []
-    for ticker in prediction_tickers:
-        pred = blind_predict(ticker, as_of_date=today)
-        predictions.append(pred)
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(prediction_tickers))) as pool:
+        predictions = list(pool.map(lambda t: blind_predict(t, as_of_date=today), prediction_tickers))
+    for ticker, pred in zip(prediction_tickers, predictions):
         logger.info(f"Prediction {ticker}: {pred.get('direction')} ({pred.get('confidence')}%)")
 
     # 4. Generate reports
@@ -64,18 +64,11 @@ def main():
     result = {
         "date": today,
         "predictions": predictions,
-        "analyses": {k: _serialize(v) for k, v in analyses.items()},
+        "analyses": analyses,
     }
-    output_file.write_text(json.dumps(result, indent=2, default=str))
+    output_file.write_bytes(orjson.dumps(result, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY, default=str))
     logger.info(f"Results saved to {output_file}")
 
 
-def _serialize(obj):
-    """Make objects JSON-serializable."""
-    if hasattr(obj, "to_dict"):
-        return obj.to_dict()
-    return obj
-
-
 if __name__ == "__main__":
     main()
@@ -10,9 +10,39 @@ import logging
 import numpy as np
 import pandas as pd
 
+from src.analysis.jit import njit
+from src.analysis.kernels import ewm_mean
+
+try:
+    import bottleneck as bn
+except ImportError:
+    bn = None
+
 logger = logging.getLogger(__name__)
 
 
+def _move_min(a: np.ndarray, window: int) -> np.ndarray:
+    """Trailing rolling min (NaN until the window is full)."""
+    if bn is not None and window <= len(a):
+        return bn.move_min(a, window)
+    return pd.Series(a).rolling(window=window).min().to_numpy()
+
+
+def _move_max(a: np.ndarray, window: int) -> np.ndarray:
+    """Trailing rolling max (NaN until the window is full)."""
+    if bn is not None and window <= len(a):
+        return bn.move_max(a, window)
+    return pd.Series(a).rolling(window=window).max().to_numpy()
+
+
+def _move_mean(a: np.ndarray, window: int) -> np.ndarray:
+    """Trailing rolling mean (NaN until the window is full)."""
+    # bottleneck rejects windows longer than the array; pandas gives all-NaN
+    if bn is not None and window <= len(a):
+        return bn.move_mean(a, window)
+    return pd.Series(a).rolling(window=window).mean().to_numpy()
+
+
 def calc_awesome_oscillator(high: pd.Series, low: pd.Series, fast: int = 5, slow: int = 34) -> pd.Series:
     """Calculate Awesome Oscillator (AO).
 
@@ -21,32 +51,21 @@ def calc_awesome_oscillator(high: pd.Series, low: pd.Series, fast: int = 5, slow
 
     Based on quant-trading Awesome Oscillator implementation.
     """
-    median_price = (high + low) / 2
-    ao = median_price.rolling(window=fast).mean() - median_price.rolling(window=slow).mean()
-    return ao
-
+    median_price = (high.to_numpy(dtype=np.float64) + low.to_numpy(dtype=np.float64)) * 0.5
+    ao = _move_mean(median_price, fast) - _move_mean(median_price, slow)
+    return pd.Series(ao, index=high.index)
 
-def calc_parabolic_sar(high: pd.Series, low: pd.Series, close: pd.Series,
-                       initial_af: float = 0.02, step_af: float = 0.02,
-                       end_af: float = 0.2) -> pd.Series:
-    """Calculate Parabolic SAR.
-
-    Ported from quant-trading Parabolic SAR backtest.py.
-    """
-    n = len(close)
-    if n < 3:
-        return pd.Series(np.nan, index=close.index)
 
+@njit(cache=True)
+def _psar_core(h, l, c, initial_af, step_af, end_af):
+    """Parabolic SAR recursion over raw float64 arrays (requires len >= 3)."""
+    n = len(c)
     sar = np.zeros(n)
     trend = np.zeros(n)
     ep = np.zeros(n)
     af = np.zeros(n)
     real_sar = np.full(n, np.nan)
 
-    h = high.values
-    l = low.values
-    c = close.values
-
     # Initialize
     trend[1] = 1.0 if c[1] > c[0] else -1.0
     sar[1] = h[0] if trend[1] > 0 else l[0]
@@ -58,10 +77,10 @@ def calc_parabolic_sar(high: pd.Series, low: pd.Series, close: pd.Series,
         temp = sar[i - 1] + af[i - 1] * (ep[i - 1] - sar[i - 1])
 
         if trend[i - 1] < 0:
-            sar[i] = max(temp, h[i - 1], h[i - 2] if i >= 2 else h[i - 1])
+            sar[i] = max(temp, h[i - 1], h[i - 2])
             trend[i] = 1 if sar[i] < h[i] else trend[i - 1] - 1
         else:
-            sar[i] = min(temp, l[i - 1], l[i - 2] if i >= 2 else l[i - 1])
+            sar[i] = min(temp, l[i - 1], l[i - 2])
             trend[i] = -1 if sar[i] > l[i] else trend[i - 1] + 1
 
         if trend[i] < 0:
@@ -79,6 +98,27 @@ def calc_parabolic_sar(high: pd.Series, low: pd.Series, close: pd.Series,
             else:
                 af[i] = min(end_af, af[i - 1] + step_af)
 
+    return real_sar
+
+
+def calc_parabolic_sar(high: pd.Series, low: pd.Series, close: pd.Series,
+                       initial_af: float = 0.02, step_af: float = 0.02,
+                       end_af: float = 0.2) -> pd.Series:
+    """Calculate Parabolic SAR.
+
+    Ported from quant-trading Parabolic SAR backtest.py. The recursion runs
+    in ``_psar_core``, which is JIT-compiled when numba is installed.
+    """
+    n = len(close)
+    if n < 3:
+        return pd.Series(np.nan, index=close.index)
+
+    real_sar = _psar_core(
+        np.ascontiguousarray(high.values, dtype=np.float64),
+        np.ascontiguousarray(low.values, dtype=np.float64),
+        np.ascontiguousarray(close.values, dtype=np.float64),
+        float(initial_af), float(step_af), float(end_af),
+    )
     return pd.Series(real_sar, index=close.index, name="parabolic_sar")
 
 
@@ -92,27 +132,30 @@ def calc_stochastic(high: pd.Series, low: pd.Series, close: pd.Series,
     Returns:
         Tuple of (%K, %D) series.
     """
-    low_n = low.rolling(window=k_period).min()
-    high_n = high.rolling(window=k_period).max()
+    low_n = _move_min(low.to_numpy(dtype=np.float64), k_period)
+    high_n = _move_max(high.to_numpy(dtype=np.float64), k_period)
     denom = high_n - low_n
-    denom = denom.replace(0, np.nan)
-    k = ((close - low_n) / denom) * 100
-    d = k.rolling(window=d_period).mean()
-    return k, d
+    denom[denom == 0] = np.nan
+    k = (close.to_numpy(dtype=np.float64) - low_n) / denom * 100
+    d = _move_mean(k, d_period)
+    return pd.Series(k, index=close.index), pd.Series(d, index=close.index)
 
 
 def calc_atr(high: pd.Series, low: pd.Series, close: pd.Series, period: int = 14) -> pd.Series:
     """Calculate Average True Range (ATR).
 
     TR = max(H-L, |H-Cprev|, |L-Cprev|)
-    ATR = EMA(TR, period)
+    ATR = EMA(TR, period), Wilder's recursion ATR_t = a*TR_t + (1-a)*ATR_{t-1}
     """
-    prev_close = close.shift(1)
-    tr1 = high - low
-    tr2 = (high - prev_close).abs()
-    tr3 = (low - prev_close).abs()
-    tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-    atr = tr.ewm(alpha=1 / period, min_periods=period).mean()
+    h = high.to_numpy(dtype=np.float64)
+    l = low.to_numpy(dtype=np.float64)
+    c = close.to_numpy(dtype=np.float64)
+    prev_close = np.empty_like(c)
+    prev_close[0] = np.nan
+    prev_close[1:] = c[:-1]
+    # fmax skips NaN like DataFrame.max(axis=1), so bar 0 keeps H-L
+    tr = np.fmax(np.fmax(h - l, np.abs(h - prev_close)), np.abs(l - prev_close))
+    atr = pd.Series(ewm_mean(tr, 1 / period, False, period), index=close.index)
     return atr
 
 
@@ -121,10 +164,50 @@ def calc_obv(close: pd.Series, volume: pd.Series) -> pd.Series:
 
     OBV adds volume on up days and subtracts on down days.
     """
-    direction = np.sign(close.diff())
-    direction.iloc[0] = 0
-    obv = (volume * direction).cumsum()
-    return obv
+    c = close.to_numpy(dtype=np.float64)
+    v = volume.to_numpy(dtype=np.float64)
+    direction = np.sign(np.diff(c, prepend=np.nan))
+    direction[0] = 0.0
+    flow = v * direction
+    # Like pandas' skipna cumsum: missing bars are skipped in the running
+    # total but stay NaN in the output
+    obv = np.where(np.isnan(flow), np.nan, np.nancumsum(flow))
+    return pd.Series(obv, index=close.index)
+
+
+# Scoring tables: (signal, reason, score delta, aggregate reason) per case.
+# Cases are listed in priority order; see _first_case.
+_AO_CASES = (
+    ("BUY", "AO crossed above zero", 1.5, "AO bullish crossover"),
+    ("SELL", "AO crossed below zero", -1.5, "AO bearish crossover"),
+    ("BUY", "AO positive", 0.5, "AO positive"),
+    ("SELL", "AO negative", -0.5, "AO negative"),
+)
+_PSAR_CASES = (
+    ("BUY", "Price above SAR (uptrend)", 1.0, "PSAR uptrend"),
+    ("SELL", "Price below SAR (downtrend)", -1.0, "PSAR downtrend"),
+)
+_STOCHASTIC_CASES = (
+    ("BUY", "Oversold", 1.5, "Stochastic oversold (K={k:.1f})"),
+    ("SELL", "Overbought", -1.5, "Stochastic overbought (K={k:.1f})"),
+    ("BUY", "K above D", 0.5, "Stochastic K>D"),
+    ("SELL", "K below D", -0.5, "Stochastic K<D"),
+)
+_OBV_CASES = (
+    ("BUY", "OBV confirms uptrend", 1.0, "OBV confirms uptrend"),
+    ("SELL", "OBV confirms downtrend", -1.0, "OBV confirms downtrend"),
+    ("BUY", "OBV divergence (bullish)", 1.5, "OBV bullish divergence"),
+    ("SELL", "OBV divergence (bearish)", -1.5, "OBV bearish divergence"),
+    None,  # flat OBV: no signal
+)
+
+
+def _first_case(cases: tuple, *conditions: bool):
+    """Pick the case for the first true condition (the last case if none is)."""
+    for i, cond in enumerate(conditions):
+        if cond:
+            return cases[i]
+    return cases[len(conditions)]
 
 
 def generate_advanced_signals(df: pd.DataFrame) -> dict:
@@ -150,65 +233,46 @@ def generate_advanced_signals(df: pd.DataFrame) -> dict:
     reasons = []
 
     # Awesome Oscillator
-    ao = calc_awesome_oscillator(high, low)
-    ao_val = ao.iloc[-1]
+    ao = calc_awesome_oscillator(high, low).to_numpy()
+    ao_val = ao[-1]
     if not np.isnan(ao_val):
-        if ao_val > 0 and ao.iloc[-2] <= 0:
-            signals["ao"] = {"value": round(float(ao_val), 4), "signal": "BUY", "reason": "AO crossed above zero"}
-            score += 1.5
-            reasons.append("AO bullish crossover")
-        elif ao_val < 0 and ao.iloc[-2] >= 0:
-            signals["ao"] = {"value": round(float(ao_val), 4), "signal": "SELL", "reason": "AO crossed below zero"}
-            score -= 1.5
-            reasons.append("AO bearish crossover")
-        elif ao_val > 0:
-            signals["ao"] = {"value": round(float(ao_val), 4), "signal": "BUY", "reason": "AO positive"}
-            score += 0.5
-            reasons.append("AO positive")
-        else:
-            signals["ao"] = {"value": round(float(ao_val), 4), "signal": "SELL", "reason": "AO negative"}
-            score -= 0.5
-            reasons.append("AO negative")
+        sig, reason, delta, label = _first_case(
+            _AO_CASES,
+            ao_val > 0 and ao[-2] <= 0,
+            ao_val < 0 and ao[-2] >= 0,
+            ao_val > 0,
+        )
+        signals["ao"] = {"value": round(float(ao_val), 4), "signal": sig, "reason": reason}
+        score += delta
+        reasons.append(label)
 
     # Parabolic SAR
-    psar = calc_parabolic_sar(high, low, close)
-    psar_val = psar.iloc[-1]
-    last_price = close.iloc[-1]
+    close_arr = close.to_numpy()
+    psar_val = calc_parabolic_sar(high, low, close).to_numpy()[-1]
+    last_price = close_arr[-1]
     if not np.isnan(psar_val):
-        if last_price > psar_val:
-            signals["psar"] = {"value": round(float(psar_val), 2), "signal": "BUY", "reason": "Price above SAR (uptrend)"}
-            score += 1
-            reasons.append("PSAR uptrend")
-        else:
-            signals["psar"] = {"value": round(float(psar_val), 2), "signal": "SELL", "reason": "Price below SAR (downtrend)"}
-            score -= 1
-            reasons.append("PSAR downtrend")
+        sig, reason, delta, label = _first_case(_PSAR_CASES, last_price > psar_val)
+        signals["psar"] = {"value": round(float(psar_val), 2), "signal": sig, "reason": reason}
+        score += delta
+        reasons.append(label)
 
     # Stochastic
     k, d = calc_stochastic(high, low, close)
-    k_val = k.iloc[-1]
-    d_val = d.iloc[-1]
+    k_val = k.to_numpy()[-1]
+    d_val = d.to_numpy()[-1]
     if not np.isnan(k_val):
-        if k_val < 20 and d_val < 20:
-            signals["stochastic"] = {"k": round(float(k_val), 1), "d": round(float(d_val), 1), "signal": "BUY", "reason": "Oversold"}
-            score += 1.5
-            reasons.append(f"Stochastic oversold (K={k_val:.1f})")
-        elif k_val > 80 and d_val > 80:
-            signals["stochastic"] = {"k": round(float(k_val), 1), "d": round(float(d_val), 1), "signal": "SELL", "reason": "Overbought"}
-            score -= 1.5
-            reasons.append(f"Stochastic overbought (K={k_val:.1f})")
-        elif k_val > d_val:
-            signals["stochastic"] = {"k": round(float(k_val), 1), "d": round(float(d_val), 1), "signal": "BUY", "reason": "K above D"}
-            score += 0.5
-            reasons.append("Stochastic K>D")
-        else:
-            signals["stochastic"] = {"k": round(float(k_val), 1), "d": round(float(d_val), 1), "signal": "SELL", "reason": "K below D"}
-            score -= 0.5
-            reasons.append("Stochastic K<D")
+        sig, reason, delta, label = _first_case(
+            _STOCHASTIC_CASES,
+            k_val < 20 and d_val < 20,
+            k_val > 80 and d_val > 80,
+            k_val > d_val,
+        )
+        signals["stochastic"] = {"k": round(float(k_val), 1), "d": round(float(d_val), 1), "signal": sig, "reason": reason}
+        score += delta
+        reasons.append(label.format(k=k_val))
 
     # ATR (volatility, no directional signal but affects confidence)
-    atr = calc_atr(high, low, close)
-    atr_val = atr.iloc[-1]
+    atr_val = calc_atr(high, low, close).to_numpy()[-1]
     if not np.isnan(atr_val):
         atr_pct = atr_val / last_price * 100
         signals["atr"] = {"value": round(float(atr_val), 4), "pct": round(float(atr_pct), 2), "signal": "INFO"}
@@ -218,25 +282,21 @@ def generate_advanced_signals(df: pd.DataFrame) -> dict:
         volume = df["Volume"].squeeze()
         if isinstance(volume, pd.DataFrame):
             volume = volume.iloc[:, 0]
-        obv = calc_obv(close, volume)
-        obv_trend = obv.iloc[-1] - obv.iloc[-5] if len(obv) >= 5 else 0
-        price_trend = close.iloc[-1] - close.iloc[-5] if len(close) >= 5 else 0
-        if obv_trend > 0 and price_trend > 0:
-            signals["obv"] = {"signal": "BUY", "reason": "OBV confirms uptrend"}
-            score += 1
-            reasons.append("OBV confirms uptrend")
-        elif obv_trend < 0 and price_trend < 0:
-            signals["obv"] = {"signal": "SELL", "reason": "OBV confirms downtrend"}
-            score -= 1
-            reasons.append("OBV confirms downtrend")
-        elif obv_trend > 0 and price_trend <= 0:
-            signals["obv"] = {"signal": "BUY", "reason": "OBV divergence (bullish)"}
-            score += 1.5
-            reasons.append("OBV bullish divergence")
-        elif obv_trend < 0 and price_trend >= 0:
-            signals["obv"] = {"signal": "SELL", "reason": "OBV divergence (bearish)"}
-            score -= 1.5
-            reasons.append("OBV bearish divergence")
+        obv = calc_obv(close, volume).to_numpy()
+        obv_trend = obv[-1] - obv[-5] if len(obv) >= 5 else 0
+        price_trend = close_arr[-1] - close_arr[-5] if len(close_arr) >= 5 else 0
+        case = _first_case(
+            _OBV_CASES,
+            obv_trend > 0 and price_trend > 0,
+            obv_trend < 0 and price_trend < 0,
+            obv_trend > 0 and price_trend <= 0,
+            obv_trend < 0 and price_trend >= 0,
+        )
+        if case is not None:
+            sig, reason, delta, label = case
+            signals["obv"] = {"signal": sig, "reason": reason}
+            score += delta
+            reasons.append(label)
 
     signals["aggregate"] = {"score": round(score, 2), "reasons": reasons}
     return signals
@@ -0,0 +1,19 @@
+"""Optional Numba JIT support.
+
+Numba is not a hard dependency. When it is missing, ``njit`` degrades to a
+no-op decorator (and ``prange`` to ``range``) so the kernels run as plain
+Python/NumPy.
+"""
+
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for ``numba.njit``."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
@@ -0,0 +1,147 @@
+"""Array kernels shared by the indicator modules.
+
+Each kernel works on raw float64 ndarrays and is JIT-compiled when numba is
+installed (see ``src.analysis.jit``). Semantics mirror the pandas methods
+they replace, including NaN handling.
+"""
+
+import numpy as np
+
+from src.analysis.jit import njit
+
+
+@njit(cache=True)
+def ewm_mean(x, alpha, adjust, min_periods):
+    """Exponentially weighted mean, equivalent to
+    ``Series.ewm(alpha=alpha, adjust=adjust, min_periods=min_periods).mean()``.
+
+    Single O(N) recursion; NaN inputs decay the old weight but add no
+    observation (pandas' ``ignore_na=False``).
+    """
+    n = len(x)
+    out = np.empty(n)
+    if n == 0:
+        return out
+
+    old_wt_factor = 1.0 - alpha
+    new_wt = 1.0 if adjust else alpha
+    weighted = x[0]
+    nobs = 0 if np.isnan(weighted) else 1
+    out[0] = weighted if nobs >= max(min_periods, 1) else np.nan
+    old_wt = 1.0
+
+    for i in range(1, n):
+        cur = x[i]
+        is_obs = not np.isnan(cur)
+        if is_obs:
+            nobs += 1
+        if not np.isnan(weighted):
+            old_wt *= old_wt_factor
+            if is_obs:
+                if weighted != cur:
+                    if not adjust and alpha == 0.5:
+                        # pandas special-cases com == 1 after gaps
+                        new_wt = 1.0 - old_wt
+                    weighted = (old_wt * weighted + new_wt * cur) / (old_wt + new_wt)
+                if adjust:
+                    old_wt += new_wt
+                else:
+                    old_wt = 1.0
+        elif is_obs:
+            weighted = cur
+        out[i] = weighted if nobs >= max(min_periods, 1) else np.nan
+
+    return out
+
+
+@njit(cache=True)
+def rsi(close, period):
+    """Relative Strength Index with ``alpha = 1/period`` EWM smoothing of
+    gains and losses, equivalent to ``technical.calc_rsi``.
+
+    A zero average loss yields NaN, as the pandas version does.
+    """
+    n = len(close)
+    gain = np.zeros(n)
+    loss = np.zeros(n)
+    for i in range(1, n):
+        d = close[i] - close[i - 1]
+        if d > 0:
+            gain[i] = d
+        elif d < 0:
+            loss[i] = -d
+
+    alpha = 1.0 / period
+    avg_gain = ewm_mean(gain, alpha, True, period)
+    avg_loss = ewm_mean(loss, alpha, True, period)
+    out = np.empty(n)
+    for i in range(n):
+        if avg_loss[i] == 0:
+            out[i] = np.nan
+        else:
+            out[i] = 100 - 100 / (1 + avg_gain[i] / avg_loss[i])
+    return out
+
+
+@njit(cache=True)
+def macd(close, fast, slow, signal_period):
+    """MACD line, signal line and histogram from span-based EMAs
+    (``adjust=False``), equivalent to ``technical.calc_macd``.
+    """
+    macd_line = (ewm_mean(close, 2.0 / (fast + 1), False, 0)
+                 - ewm_mean(close, 2.0 / (slow + 1), False, 0))
+    signal_line = ewm_mean(macd_line, 2.0 / (signal_period + 1), False, 0)
+    return macd_line, signal_line, macd_line - signal_line
+
+
+@njit(cache=True)
+def rolling_mean_std(x, window):
+    """Trailing rolling mean and sample std (ddof=1) in one pass, like
+    ``rolling(window).mean()`` / ``.std()``.
+
+    Uses Welford updates, adding the entering value and removing the leaving
+    one per step. Windows containing NaN are NaN; windows of one repeated
+    value return it exactly with zero std.
+    """
+    n = len(x)
+    mean_out = np.full(n, np.nan)
+    std_out = np.full(n, np.nan)
+
+    nobs = 0
+    mean = 0.0
+    ssqdm = 0.0
+    same_run = 0
+    for i in range(n):
+        val = x[i]
+        if not np.isnan(val):
+            nobs += 1
+            delta = val - mean
+            mean += delta / nobs
+            ssqdm += delta * (val - mean)
+            if i > 0 and val == x[i - 1]:
+                same_run += 1
+            else:
+                same_run = 1
+        else:
+            same_run = 0
+
+        if i >= window:
+            old = x[i - window]
+            if not np.isnan(old):
+                nobs -= 1
+                if nobs > 0:
+                    delta = old - mean
+                    mean -= delta / nobs
+                    ssqdm -= delta * (old - mean)
+                else:
+                    mean = 0.0
+                    ssqdm = 0.0
+
+        if i >= window - 1 and nobs == window:
+            if same_run >= window:
+                mean_out[i] = val
+                std_out[i] = 0.0
+            else:
+                mean_out[i] = mean
+                std_out[i] = np.sqrt(max(ssqdm, 0.0) / (window - 1)) if window > 1 else np.nan
+    return mean_out, std_out
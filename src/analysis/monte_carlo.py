@@ -2,6 +2,7 @@
 Monte Carlo Simulation for price paths, VaR, and portfolio risk analysis.
 """
 
+import functools
 import logging
 
 import numpy as np
@@ -18,17 +19,28 @@ def simulate_price_paths(
     days: int = 30,
     n_simulations: int = 10_000,
     dt: float = 1 / 252,
+    rng: np.random.Generator | None = None,
+    dtype: type = np.float64,
 ) -> np.ndarray:
     """
     Geometric Brownian Motion price path simulation.
 
+    Args:
+        rng: random generator (a fresh PCG64 ``default_rng()`` if None)
+        dtype: float64 or float32; float32 halves memory traffic
+
     Returns ndarray of shape (n_simulations, days+1) including the starting price.
     """
-    z = np.random.standard_normal((n_simulations, days))
+    rng = rng if rng is not None else np.random.default_rng()
+    z = rng.standard_normal((n_simulations, days), dtype=dtype)
     daily_returns = (mu - 0.5 * sigma**2) * dt + sigma * np.sqrt(dt) * z
-    price_paths = np.zeros((n_simulations, days + 1))
+    price_paths = np.empty((n_simulations, days + 1), dtype=dtype)
     price_paths[:, 0] = current_price
-    price_paths[:, 1:] = current_price * np.exp(np.cumsum(daily_returns, axis=1))
+    # Accumulate, exponentiate and scale in place — no intermediate temporaries
+    growth = price_paths[:, 1:]
+    np.cumsum(daily_returns, axis=1, out=growth)
+    np.exp(growth, out=growth)
+    growth *= current_price
     return price_paths
 
 
@@ -75,12 +87,47 @@ def calc_expected_range(
     }
 
 
+@functools.lru_cache(maxsize=32)
+def _estimate_params(
+    tickers: tuple[str, ...],
+    lookback_period: str,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Download history and estimate annualized mu/sigma, the Cholesky factor
+    of the return correlation matrix, and the latest prices.
+
+    Cached per (tickers, lookback_period) so repeated scenario runs skip the
+    download; call ``_estimate_params.cache_clear()`` to force a refresh.
+    The returned arrays are shared between calls and marked read-only.
+    """
+    data = yf.download(list(tickers), period=lookback_period, auto_adjust=True)["Close"]
+    if isinstance(data, pd.Series):
+        data = data.to_frame(tickers[0])
+    data = data.dropna()
+
+    log_returns = np.log(data / data.shift(1)).dropna()
+    mu = log_returns.mean().values * 252
+    sigma = log_returns.std().values * np.sqrt(252)
+    corr_matrix = log_returns.corr().values
+
+    # Cholesky decomposition for correlated random walks
+    L = np.linalg.cholesky(corr_matrix)
+    current_prices = data.iloc[-1].to_numpy(dtype=np.float64, copy=True)
+
+    params = (mu, sigma, L, current_prices)
+    for arr in params:
+        arr.setflags(write=False)
+    return params
+
+
 def portfolio_monte_carlo(
     tickers: list[str],
     weights: list[float],
     days: int = 30,
     n_simulations: int = 10_000,
     lookback_period: str = "1y",
+    rng: np.random.Generator | None = None,
+    dtype: type = np.float64,
 ) -> dict:
     """
     Portfolio-level Monte Carlo risk analysis.
@@ -88,41 +135,31 @@ def portfolio_monte_carlo(
     Downloads historical data, estimates mu/sigma per asset,
     simulates correlated paths via Cholesky decomposition,
     and returns VaR + expected range for the weighted portfolio.
+    ``rng`` and ``dtype`` behave as in ``simulate_price_paths``.
     """
+    rng = rng if rng is not None else np.random.default_rng()
     weights = np.array(weights)
     weights = weights / weights.sum()
 
-    data = yf.download(tickers, period=lookback_period, auto_adjust=True)["Close"]
-    if isinstance(data, pd.Series):
-        data = data.to_frame(tickers[0])
-    data = data.dropna()
-
-    log_returns = np.log(data / data.shift(1)).dropna()
-    mu = log_returns.mean().values * 252
-    sigma = log_returns.std().values * np.sqrt(252)
-    corr_matrix = log_returns.corr().values
-
-    # Cholesky decomposition for correlated random walks
-    L = np.linalg.cholesky(corr_matrix)
+    mu, sigma, L, current_prices = _estimate_params(tuple(tickers), lookback_period)
     dt = 1 / 252
     n_assets = len(tickers)
 
-    current_prices = data.iloc[-1].values
     portfolio_value = (current_prices * weights).sum()
 
-    # Simulate
-    port_paths = np.zeros((n_simulations, days + 1))
+    # Simulate all steps at once: one (days*N, A) @ (A, A) product, then
+    # accumulate log-increments along the time axis
+    z = rng.standard_normal((days, n_simulations, n_assets), dtype=dtype)
+    log_paths = (z.reshape(-1, n_assets) @ L.T.astype(dtype)).reshape(days, n_simulations, n_assets)
+    log_paths *= (sigma * np.sqrt(dt)).astype(dtype)
+    log_paths += ((mu - 0.5 * sigma**2) * dt).astype(dtype)
+    np.cumsum(log_paths, axis=0, out=log_paths)
+    asset_prices = np.exp(log_paths, out=log_paths)
+    asset_prices *= current_prices.astype(dtype)
+
+    port_paths = np.empty((n_simulations, days + 1), dtype=dtype)
     port_paths[:, 0] = portfolio_value
-
-    asset_prices = np.tile(current_prices, (n_simulations, 1))
-
-    for t in range(1, days + 1):
-        z = np.random.standard_normal((n_simulations, n_assets))
-        correlated_z = z @ L.T
-        drift = (mu - 0.5 * sigma**2) * dt
-        diffusion = sigma * np.sqrt(dt) * correlated_z
-        asset_prices = asset_prices * np.exp(drift + diffusion)
-        port_paths[:, t] = (asset_prices * weights).sum(axis=1)
+    port_paths[:, 1:] = (asset_prices @ weights.astype(dtype)).T
 
     var_info = calc_var(port_paths)
     range_info = calc_expected_range(port_paths)
@@ -1,13 +1,48 @@
 """Chart pattern recognition for price series."""
 
+import copy
+import functools
 import logging
 from typing import Optional
 
 import numpy as np
 import pandas as pd
 
+from src.analysis.jit import njit
+
 logger = logging.getLogger(__name__)
 
+# Lookbacks of the detectors run by analyze_patterns (their default periods)
+PATTERN_WINDOW = 100
+DOUBLE_PATTERN_PERIOD = 75
+
+
+def _sparse_table(a: np.ndarray, op) -> list[np.ndarray]:
+    """Sparse table for O(1) range queries of an idempotent ``op``
+    (np.minimum / np.maximum); level k holds results over 2**k-long runs.
+    """
+    table = [a]
+    half = 1
+    while 2 * half <= len(a):
+        prev = table[-1]
+        table.append(op(prev[:-half], prev[half:]))
+        half *= 2
+    return table
+
+
+def _range_query(table: list[np.ndarray], op, lo: int, hi: int) -> float:
+    """``op``-reduction of the original array over the inclusive range [lo, hi]."""
+    k = int(hi - lo + 1).bit_length() - 1
+    return op(table[k][lo], table[k][hi - (1 << k) + 1])
+
+
+def _local_extrema(recent: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Indices of strict 3-bar local minima and maxima."""
+    mid = recent[1:-1]
+    min_idx = np.flatnonzero((mid < recent[:-2]) & (mid < recent[2:])) + 1
+    max_idx = np.flatnonzero((mid > recent[:-2]) & (mid > recent[2:])) + 1
+    return min_idx, max_idx
+
 
 def detect_double_bottom(prices: pd.Series, period: int = 75, tolerance: float = 0.03) -> dict:
     """Detect double bottom (W) pattern.
@@ -25,42 +60,45 @@ def detect_double_bottom(prices: pd.Series, period: int = 75, tolerance: float =
     if len(prices) < period:
         return {"detected": False, "signal": "HOLD", "confidence": 0}
 
-    recent = prices.iloc[-period:].values
-    n = len(recent)
+    recent = prices.iloc[-period:].to_numpy(dtype=np.float32)
+    min_idx, _ = _local_extrema(recent)
+    return _match_double_bottom(recent, min_idx, tolerance)
+
 
-    # Find local minima
-    minima = []
-    for i in range(1, n - 1):
-        if recent[i] < recent[i - 1] and recent[i] < recent[i + 1]:
-            minima.append((i, recent[i]))
+def _match_double_bottom(recent: np.ndarray, min_idx: np.ndarray, tolerance: float) -> dict:
+    """Double bottom search over a window given its local-minimum indices."""
+    min_val = recent[min_idx]
 
-    if len(minima) < 2:
+    if len(min_idx) < 2:
         return {"detected": False, "signal": "HOLD", "confidence": 0}
 
+    # Bottoms should be at similar levels: test all adjacent pairs at once
+    similar = np.abs(np.diff(min_val)) / np.maximum(min_val[:-1], min_val[1:]) < tolerance
+
     # Check last two minima for double bottom
-    for i in range(len(minima) - 1, 0, -1):
-        idx2, val2 = minima[i]
-        idx1, val1 = minima[i - 1]
-
-        # Bottoms should be at similar levels
-        if abs(val1 - val2) / max(val1, val2) < tolerance:
-            # There should be a peak between them
-            between = recent[idx1:idx2 + 1]
-            peak = np.max(between)
-            if peak > val1 * (1 + tolerance):
-                # Current price should be above the neckline (peak between bottoms)
-                current = recent[-1]
-                if current > peak:
-                    conf = min(((current - peak) / peak) * 1000, 80)
-                    return {
-                        "detected": True,
-                        "signal": "BUY",
-                        "confidence": round(conf, 1),
-                        "pattern": "double_bottom",
-                        "bottom1": round(float(val1), 2),
-                        "bottom2": round(float(val2), 2),
-                        "neckline": round(float(peak), 2),
-                    }
+    peak_table = None
+    for i in np.flatnonzero(similar)[::-1] + 1:
+        idx2, val2 = min_idx[i], min_val[i]
+        idx1, val1 = min_idx[i - 1], min_val[i - 1]
+
+        # There should be a peak between them
+        if peak_table is None:
+            peak_table = _sparse_table(recent, np.maximum)
+        peak = _range_query(peak_table, np.maximum, idx1, idx2)
+        if peak > val1 * (1 + tolerance):
+            # Current price should be above the neckline (peak between bottoms)
+            current = recent[-1]
+            if current > peak:
+                conf = min(float(current - peak) / float(peak) * 1000, 80)
+                return {
+                    "detected": True,
+                    "signal": "BUY",
+                    "confidence": round(conf, 1),
+                    "pattern": "double_bottom",
+                    "bottom1": round(float(val1), 2),
+                    "bottom2": round(float(val2), 2),
+                    "neckline": round(float(peak), 2),
+                }
 
     return {"detected": False, "signal": "HOLD", "confidence": 0}
 
@@ -74,42 +112,49 @@ def detect_double_top(prices: pd.Series, period: int = 75, tolerance: float = 0.
     if len(prices) < period:
         return {"detected": False, "signal": "HOLD", "confidence": 0}
 
-    recent = prices.iloc[-period:].values
-    n = len(recent)
+    recent = prices.iloc[-period:].to_numpy(dtype=np.float32)
+    _, max_idx = _local_extrema(recent)
+    return _match_double_top(recent, max_idx, tolerance)
+
 
-    # Find local maxima
-    maxima = []
-    for i in range(1, n - 1):
-        if recent[i] > recent[i - 1] and recent[i] > recent[i + 1]:
-            maxima.append((i, recent[i]))
+def _match_double_top(recent: np.ndarray, max_idx: np.ndarray, tolerance: float) -> dict:
+    """Double top search over a window given its local-maximum indices."""
+    max_val = recent[max_idx]
 
-    if len(maxima) < 2:
+    if len(max_idx) < 2:
         return {"detected": False, "signal": "HOLD", "confidence": 0}
 
-    for i in range(len(maxima) - 1, 0, -1):
-        idx2, val2 = maxima[i]
-        idx1, val1 = maxima[i - 1]
-
-        if abs(val1 - val2) / max(val1, val2) < tolerance:
-            between = recent[idx1:idx2 + 1]
-            trough = np.min(between)
-            if trough < val1 * (1 - tolerance):
-                current = recent[-1]
-                if current < trough:
-                    conf = min(((trough - current) / trough) * 1000, 80)
-                    return {
-                        "detected": True,
-                        "signal": "SELL",
-                        "confidence": round(conf, 1),
-                        "pattern": "double_top",
-                        "top1": round(float(val1), 2),
-                        "top2": round(float(val2), 2),
-                        "neckline": round(float(trough), 2),
-                    }
+    similar = np.abs(np.diff(max_val)) / np.maximum(max_val[:-1], max_val[1:]) < tolerance
+
+    trough_table = None
+    for i in np.flatnonzero(similar)[::-1] + 1:
+        idx2, val2 = max_idx[i], max_val[i]
+        idx1, val1 = max_idx[i - 1], max_val[i - 1]
+
+        if trough_table is None:
+            trough_table = _sparse_table(recent, np.minimum)
+        trough = _range_query(trough_table, np.minimum, idx1, idx2)
+        if trough < val1 * (1 - tolerance):
+            current = recent[-1]
+            if current < trough:
+                conf = min(float(trough - current) / float(trough) * 1000, 80)
+                return {
+                    "detected": True,
+                    "signal": "SELL",
+                    "confidence": round(conf, 1),
+                    "pattern": "double_top",
+                    "top1": round(float(val1), 2),
+                    "top2": round(float(val2), 2),
+                    "neckline": round(float(trough), 2),
+                }
 
     return {"detected": False, "signal": "HOLD", "confidence": 0}
 
 
+# Centered 3-bar window used to smooth peaks in H&S detection
+_SMOOTH_KERNEL = np.ones(3)
+
+
 def detect_head_and_shoulders(prices: pd.Series, period: int = 100, tolerance: float = 0.03) -> dict:
     """Detect head and shoulders pattern.
 
@@ -122,36 +167,59 @@ def detect_head_and_shoulders(prices: pd.Series, period: int = 100, tolerance: f
     if len(prices) < period:
         return {"detected": False, "signal": "HOLD", "confidence": 0}
 
-    recent = prices.iloc[-period:].values
-    n = len(recent)
+    recent = prices.iloc[-period:].to_numpy(dtype=np.float32)
+    return _match_head_and_shoulders(recent, tolerance)
 
-    # Find local maxima (smoothed to avoid noise)
-    smoothed = pd.Series(recent).rolling(3, center=True).mean().bfill().ffill().values
-    maxima = []
+
+@njit(cache=True)
+def _peak_indices(smoothed):
+    """Indices i in [2, n-2) where smoothed[i] beats both neighbours on each side."""
+    n = len(smoothed)
+    out = np.empty(max(n - 4, 0), dtype=np.int64)
+    count = 0
     for i in range(2, n - 2):
         if smoothed[i] > smoothed[i - 1] and smoothed[i] > smoothed[i + 1]:
             if smoothed[i] > smoothed[i - 2] and smoothed[i] > smoothed[i + 2]:
-                maxima.append((i, recent[i]))
+                out[count] = i
+                count += 1
+    return out[:count]
+
+
+def _match_head_and_shoulders(recent: np.ndarray, tolerance: float) -> dict:
+    """Head and shoulders search over a price window."""
+    n = len(recent)
 
-    if len(maxima) < 3:
+    # Find local maxima (smoothed to avoid noise)
+    # Sum then divide (like rolling().mean()) so equal windows tie exactly
+    smoothed = np.convolve(recent, _SMOOTH_KERNEL, mode="same") / 3.0
+    # The edges only have two taps; copy their neighbours like bfill/ffill would
+    smoothed[0] = smoothed[1]
+    smoothed[-1] = smoothed[-2]
+    max_idx = _peak_indices(smoothed)
+    max_val = recent[max_idx]
+
+    if len(max_idx) < 3:
         return {"detected": False, "signal": "HOLD", "confidence": 0}
 
     # Check last 3 peaks
-    for i in range(len(maxima) - 1, 1, -1):
-        right_idx, right_val = maxima[i]
-        head_idx, head_val = maxima[i - 1]
-        left_idx, left_val = maxima[i - 2]
+    trough_table = None
+    for i in range(len(max_idx) - 1, 1, -1):
+        right_idx, right_val = max_idx[i], max_val[i]
+        head_idx, head_val = max_idx[i - 1], max_val[i - 1]
+        left_idx, left_val = max_idx[i - 2], max_val[i - 2]
 
         # Head must be highest
         if head_val > left_val and head_val > right_val:
             # Shoulders at similar levels
             if abs(left_val - right_val) / max(left_val, right_val) < tolerance:
                 # Neckline: troughs between shoulders and head
-                trough1 = np.min(recent[left_idx:head_idx + 1])
-                trough2 = np.min(recent[head_idx:right_idx + 1])
-                neckline = (trough1 + trough2) / 2
+                if trough_table is None:
+                    trough_table = _sparse_table(recent, np.minimum)
+                trough1 = _range_query(trough_table, np.minimum, left_idx, head_idx)
+                trough2 = _range_query(trough_table, np.minimum, head_idx, right_idx)
+                neckline = (float(trough1) + float(trough2)) / 2
 
-                current = recent[-1]
+                current = float(recent[-1])
                 if current < neckline:
                     conf = min(((neckline - current) / neckline) * 500, 85)
                     return {
@@ -177,19 +245,24 @@ def detect_support_resistance(prices: pd.Series, period: int = 100, num_levels:
     if len(prices) < period:
         return {"support_levels": [], "resistance_levels": [], "signal": "HOLD", "confidence": 0}
 
-    recent = prices.iloc[-period:].values
-    current = recent[-1]
+    recent = prices.iloc[-period:].to_numpy(dtype=np.float32)
+    return _match_support_resistance(recent, num_levels)
+
+
+def _match_support_resistance(recent: np.ndarray, num_levels: int) -> dict:
+    """Support/resistance levels and signal for a price window."""
+    current = float(recent[-1])
     n = len(recent)
 
     # Collect local extrema
+    window = 5
     local_min = []
     local_max = []
-    window = 5
-    for i in range(window, n - window):
-        if recent[i] == np.min(recent[i - window:i + window + 1]):
-            local_min.append(recent[i])
-        if recent[i] == np.max(recent[i - window:i + window + 1]):
-            local_max.append(recent[i])
+    if n > 2 * window:
+        windows = np.lib.stride_tricks.sliding_window_view(recent, 2 * window + 1)
+        centers = recent[window:n - window]
+        local_min = centers[centers == windows.min(axis=1)].tolist()
+        local_max = centers[centers == windows.max(axis=1)].tolist()
 
     if not local_min and not local_max:
         return {"support_levels": [], "resistance_levels": [], "signal": "HOLD", "confidence": 0}
@@ -198,16 +271,15 @@ def detect_support_resistance(prices: pd.Series, period: int = 100, num_levels:
     def cluster_levels(levels, max_levels):
         if not levels:
             return []
-        levels = sorted(levels)
-        clusters = [[levels[0]]]
-        for lev in levels[1:]:
-            if abs(lev - clusters[-1][-1]) / max(abs(clusters[-1][-1]), 1e-10) < 0.015:
-                clusters[-1].append(lev)
-            else:
-                clusters.append([lev])
-        # Sort by cluster size (most touches = strongest)
-        clusters.sort(key=len, reverse=True)
-        return [round(float(np.mean(c)), 2) for c in clusters[:max_levels]]
+        levels = np.sort(levels)
+        # A new cluster starts wherever the gap to the previous level is >= 1.5%
+        gaps = np.abs(np.diff(levels)) / np.maximum(np.abs(levels[:-1]), 1e-10)
+        group_id = np.concatenate(([0], np.cumsum(gaps >= 0.015)))
+        sizes = np.bincount(group_id)
+        means = np.bincount(group_id, weights=levels) / sizes
+        # Sort by cluster size (most touches = strongest); ties keep price order
+        order = np.argsort(-sizes, kind="stable")[:max_levels]
+        return [round(float(m), 2) for m in means[order]]
 
     supports = cluster_levels([l for l in local_min if l < current], num_levels)
     resistances = cluster_levels([l for l in local_max if l > current], num_levels)
@@ -239,16 +311,41 @@ def detect_support_resistance(prices: pd.Series, period: int = 100, num_levels:
 def analyze_patterns(prices: pd.Series) -> dict:
     """Run all pattern detections and return combined result.
 
+    The detectors only look at the last ``PATTERN_WINDOW`` bars, so results
+    are memoized on those values; repeated calls on the same window (e.g.
+    overlapping backtest frames) are served from the cache.
+
     Returns:
         Dict with individual pattern results and an aggregate signal/score.
     """
+    window = tuple(prices.iloc[-PATTERN_WINDOW:].tolist())
+    return copy.deepcopy(_analyze_window(window))
+
+
+@functools.lru_cache(maxsize=256)
+def _analyze_window(window: tuple) -> dict:
+    """Cached body of analyze_patterns; callers must not mutate the result."""
+    recent = np.array(window, dtype=np.float32)
+    n = len(recent)
     results = {
-        "double_bottom": detect_double_bottom(prices),
-        "double_top": detect_double_top(prices),
-        "head_and_shoulders": detect_head_and_shoulders(prices),
-        "support_resistance": detect_support_resistance(prices),
+        "double_bottom": {"detected": False, "signal": "HOLD", "confidence": 0},
+        "double_top": {"detected": False, "signal": "HOLD", "confidence": 0},
+        "head_and_shoulders": {"detected": False, "signal": "HOLD", "confidence": 0},
+        "support_resistance": {"support_levels": [], "resistance_levels": [], "signal": "HOLD", "confidence": 0},
     }
 
+    # One extrema pass over the full window; the double bottom/top tail
+    # keeps the extrema strictly inside its first bar
+    if n >= DOUBLE_PATTERN_PERIOD:
+        offset = n - DOUBLE_PATTERN_PERIOD
+        tail = recent[offset:]
+        min_idx, max_idx = _local_extrema(recent)
+        results["double_bottom"] = _match_double_bottom(tail, min_idx[min_idx > offset] - offset, 0.03)
+        results["double_top"] = _match_double_top(tail, max_idx[max_idx > offset] - offset, 0.03)
+    if n >= PATTERN_WINDOW:
+        results["head_and_shoulders"] = _match_head_and_shoulders(recent, 0.03)
+        results["support_resistance"] = _match_support_resistance(recent, 3)
+
     # Aggregate: sum up directional signals
     score = 0.0
     reasons = []
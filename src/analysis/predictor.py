@@ -6,8 +6,11 @@ Integrates:
 - Advanced momentum indicators (AO, PSAR, Stochastic, ATR, OBV) — weight: 30%
 """
 
+import functools
 import json
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 
@@ -16,10 +19,10 @@ import pandas as pd
 import yfinance as yf
 
 from src.analysis.technical import (
-    calc_bollinger,
-    calc_macd,
-    calc_moving_averages,
-    calc_rsi,
+    _bollinger_np,
+    _macd_np,
+    _rsi_np,
+    _sma_last,
     generate_signals,
 )
 from src.analysis.patterns import analyze_patterns
@@ -31,6 +34,7 @@ from src.analysis.advanced_indicators import (
     calc_obv,
     generate_advanced_signals,
 )
+from src.analysis.jit import njit
 
 logger = logging.getLogger(__name__)
 
@@ -39,85 +43,147 @@ WEIGHT_TECHNICAL = 0.40
 WEIGHT_PATTERN = 0.30
 WEIGHT_MOMENTUM = 0.30
 
+# Calendar days of history fetched before each prediction date
+LOOKBACK_DAYS = 250
+
+# Seconds a downloaded price frame is reused before it is fetched again
+DOWNLOAD_TTL = 3600
+
+
+@functools.lru_cache(maxsize=64)
+def _cached_download(ticker: str, start: str, end: str, ttl_bucket: int) -> pd.DataFrame:
+    return yf.download(ticker, start=start, end=end, progress=False)
+
+
+def _download(ticker: str, start: str, end: str) -> pd.DataFrame:
+    """yf.download with an in-process cache (entries expire after DOWNLOAD_TTL).
+
+    The returned frame is shared between callers and must not be mutated.
+    """
+    return _cached_download(ticker, start, end, int(time.time() // DOWNLOAD_TTL))
+
+
+# Reason templates indexed by the case codes _technical_score_kernel returns
+_RSI_REASONS = (
+    "RSI oversold ({rsi:.1f})",
+    "RSI low ({rsi:.1f})",
+    "RSI overbought ({rsi:.1f})",
+    "RSI high ({rsi:.1f})",
+    "RSI neutral ({rsi:.1f})",
+)
+_MACD_REASONS = (
+    "MACD bullish & strengthening",
+    "MACD bullish",
+    "MACD bearish & weakening",
+    "MACD bearish",
+)
+_BOLLINGER_REASONS = ("Near lower Bollinger ({bb_pos:.2f})", "Near upper Bollinger ({bb_pos:.2f})", None)
+_MA_REASONS = ("MA5 > MA25 (bullish)", "MA5 < MA25 (bearish)")
+_MOMENTUM_REASONS = ("5d momentum +{mom5:.1f}% (pullback risk)", "5d momentum {mom5:.1f}% (bounce potential)", None)
 
-def _calc_technical_score(close: pd.Series, data: pd.DataFrame) -> tuple[float, list[str]]:
-    """Calculate technical indicator score (RSI, MACD, Bollinger, MA).
+
+@njit(cache=True, nogil=True)
+def _technical_score_kernel(rsi, macd, signal, hist, hist_prev, bb_pos, ma5, ma25, mom5):
+    """Score the latest indicator values.
 
     Returns:
-        Tuple of (normalized_score [-1, 1], reasons).
+        Tuple of (normalized_score [-1, 1], rsi_case, macd_case,
+        bollinger_case, ma_case, momentum_case).
     """
     score = 0.0
     max_score = 7.0
-    reasons = []
 
-    rsi = calc_rsi(close)
-    rsi_val = rsi.iloc[-1]
-    if rsi_val < 30:
+    if rsi < 30:
         score += 2
-        reasons.append(f"RSI oversold ({rsi_val:.1f})")
-    elif rsi_val < 40:
+        rsi_case = 0
+    elif rsi < 40:
         score += 1
-        reasons.append(f"RSI low ({rsi_val:.1f})")
-    elif rsi_val > 70:
+        rsi_case = 1
+    elif rsi > 70:
         score -= 2
-        reasons.append(f"RSI overbought ({rsi_val:.1f})")
-    elif rsi_val > 60:
+        rsi_case = 2
+    elif rsi > 60:
         score -= 1
-        reasons.append(f"RSI high ({rsi_val:.1f})")
+        rsi_case = 3
     else:
-        reasons.append(f"RSI neutral ({rsi_val:.1f})")
+        rsi_case = 4
 
-    macd_line, signal_line, hist = calc_macd(close)
-    macd_val = macd_line.iloc[-1]
-    sig_val = signal_line.iloc[-1]
-    if macd_val > sig_val:
+    if macd > signal:
         score += 1
-        if hist.iloc[-1] > hist.iloc[-2]:
+        if hist > hist_prev:
             score += 1
-            reasons.append("MACD bullish & strengthening")
+            macd_case = 0
         else:
-            reasons.append("MACD bullish")
+            macd_case = 1
     else:
         score -= 1
-        if hist.iloc[-1] < hist.iloc[-2]:
+        if hist < hist_prev:
             score -= 1
-            reasons.append("MACD bearish & weakening")
+            macd_case = 2
         else:
-            reasons.append("MACD bearish")
+            macd_case = 3
 
-    upper, middle, lower = calc_bollinger(close)
-    last_price = close.iloc[-1]
-    bb_range = upper.iloc[-1] - lower.iloc[-1]
-    bb_pos = (last_price - lower.iloc[-1]) / bb_range if bb_range > 0 else 0.5
     if bb_pos < 0.2:
         score += 1.5
-        reasons.append(f"Near lower Bollinger ({bb_pos:.2f})")
+        bb_case = 0
     elif bb_pos > 0.8:
         score -= 1.5
-        reasons.append(f"Near upper Bollinger ({bb_pos:.2f})")
+        bb_case = 1
+    else:
+        bb_case = 2
 
-    mas = calc_moving_averages(close)
-    if 5 in mas and 25 in mas:
-        ma5 = mas[5].iloc[-1]
-        ma25 = mas[25].iloc[-1]
-        if ma5 > ma25:
-            score += 1
-            reasons.append("MA5 > MA25 (bullish)")
-        else:
-            score -= 1
-            reasons.append("MA5 < MA25 (bearish)")
-
-    # 5-day momentum with mean reversion bias
-    if len(close) >= 6:
-        mom5 = (close.iloc[-1] / close.iloc[-6] - 1) * 100
-        if mom5 > 3:
-            score -= 0.5
-            reasons.append(f"5d momentum +{mom5:.1f}% (pullback risk)")
-        elif mom5 < -3:
-            score += 0.5
-            reasons.append(f"5d momentum {mom5:.1f}% (bounce potential)")
+    if ma5 > ma25:
+        score += 1
+        ma_case = 0
+    else:
+        score -= 1
+        ma_case = 1
+
+    # 5-day momentum with mean reversion bias (NaN when history is too short)
+    if mom5 > 3:
+        score -= 0.5
+        mom_case = 0
+    elif mom5 < -3:
+        score += 0.5
+        mom_case = 1
+    else:
+        mom_case = 2
 
     normalized = max(min(score / max_score, 1.0), -1.0)
+    return normalized, rsi_case, macd_case, bb_case, ma_case, mom_case
+
+
+def _calc_technical_score(close: pd.Series, data: pd.DataFrame) -> tuple[float, list[str]]:
+    """Calculate technical indicator score (RSI, MACD, Bollinger, MA).
+
+    Returns:
+        Tuple of (normalized_score [-1, 1], reasons).
+    """
+    close_arr = close.to_numpy(dtype=np.float64)
+    rsi_val = float(_rsi_np(close_arr, 14)[-1])
+    macd_line, signal_line, hist = _macd_np(close_arr, 12, 26, 9)
+    macd_val, signal_val = float(macd_line[-1]), float(signal_line[-1])
+    hist_val, hist_prev = float(hist[-1]), float(hist[-2])
+
+    upper, _, lower = _bollinger_np(close_arr, 20, 2.0)
+    upper_val, lower_val = float(upper[-1]), float(lower[-1])
+    last_price = close_arr[-1]
+    bb_range = upper_val - lower_val
+    bb_pos = float((last_price - lower_val) / bb_range) if bb_range > 0 else 0.5
+
+    mom5 = float((close_arr[-1] / close_arr[-6] - 1) * 100) if len(close_arr) >= 6 else np.nan
+
+    normalized, rsi_case, macd_case, bb_case, ma_case, mom_case = _technical_score_kernel(
+        rsi_val, macd_val, signal_val, hist_val, hist_prev, bb_pos,
+        _sma_last(close_arr, 5), _sma_last(close_arr, 25), mom5,
+    )
+
+    reasons = [_RSI_REASONS[rsi_case].format(rsi=rsi_val), _MACD_REASONS[macd_case]]
+    if _BOLLINGER_REASONS[bb_case] is not None:
+        reasons.append(_BOLLINGER_REASONS[bb_case].format(bb_pos=bb_pos))
+    reasons.append(_MA_REASONS[ma_case])
+    if _MOMENTUM_REASONS[mom_case] is not None:
+        reasons.append(_MOMENTUM_REASONS[mom_case].format(mom5=mom5))
     return normalized, reasons
 
 
@@ -171,11 +237,21 @@ def blind_predict(ticker: str, as_of_date: Optional[str] = None) -> dict:
         as_of_date = datetime.now().strftime("%Y-%m-%d")
 
     cutoff = pd.Timestamp(as_of_date)
-    start = (cutoff - timedelta(days=250)).strftime("%Y-%m-%d")
+    start = (cutoff - timedelta(days=LOOKBACK_DAYS)).strftime("%Y-%m-%d")
     end = (cutoff + timedelta(days=1)).strftime("%Y-%m-%d")
 
     try:
-        data = yf.download(ticker, start=start, end=end, progress=False)
+        data = _download(ticker, start, end)
+    except Exception as e:
+        logger.error(f"blind_predict failed for {ticker}: {e}")
+        return {"ticker": ticker, "as_of_date": as_of_date, "direction": "FLAT", "confidence": 0, "error": str(e)}
+    return _predict_from_data(ticker, as_of_date, data)
+
+
+def _predict_from_data(ticker: str, as_of_date: str, data: pd.DataFrame) -> dict:
+    """Score a prediction from already-fetched OHLCV data (see blind_predict)."""
+    cutoff = pd.Timestamp(as_of_date)
+    try:
         if data.empty:
             return {"ticker": ticker, "as_of_date": as_of_date, "direction": "FLAT", "confidence": 0, "error": "No data"}
 
@@ -230,7 +306,7 @@ def blind_predict(ticker: str, as_of_date: Optional[str] = None) -> dict:
                 "momentum": {"score": round(momentum_score, 4), "weight": WEIGHT_MOMENTUM},
             },
             "indicators": {
-                "price": round(float(close.iloc[-1]), 2),
+                "price": round(float(close.to_numpy()[-1]), 2),
             },
             "reasoning": all_reasons,
         }
@@ -246,15 +322,25 @@ def evaluate_prediction(ticker: str, prediction_date: str, actual_date: str) ->
     start = prediction_date
     end = (pd.Timestamp(actual_date) + timedelta(days=1)).strftime("%Y-%m-%d")
     try:
-        data = yf.download(ticker, start=start, end=end, progress=False)
+        data = _download(ticker, start, end)
+    except Exception as e:
+        logger.error(f"evaluate_prediction failed: {e}")
+        return {"error": str(e), "prediction": pred}
+    return _evaluate_from_data(ticker, prediction_date, actual_date, pred, data)
+
+
+def _evaluate_from_data(ticker: str, prediction_date: str, actual_date: str, pred: dict, data: pd.DataFrame) -> dict:
+    """Score a prediction against already-fetched prices for the outcome window."""
+    try:
         if data.empty or len(data) < 2:
             return {"error": "Insufficient actual data", "prediction": pred}
 
         close = data["Close"].squeeze()
         if isinstance(close, pd.DataFrame):
             close = close.iloc[:, 0]
-        start_price = close.iloc[0]
-        end_price = close.iloc[-1]
+        close_arr = close.to_numpy()
+        start_price = close_arr[0]
+        end_price = close_arr[-1]
         actual_return = (end_price / start_price - 1) * 100
 
         if actual_return > 0.5:
@@ -281,32 +367,65 @@ def evaluate_prediction(ticker: str, prediction_date: str, actual_date: str) ->
         return {"error": str(e), "prediction": pred}
 
 
-def backtest(ticker: str, start_date: str, end_date: str) -> pd.DataFrame:
-    """Run blind predictions weekly and calculate accuracy."""
+def backtest(ticker: str, start_date: str, end_date: str, max_workers: int = 8) -> pd.DataFrame:
+    """Run blind predictions weekly and calculate accuracy.
+
+    Prices for the whole period (plus the lookback) are downloaded once.
+    Weekly outcomes are computed as array ops on that series; the per-date
+    predictions are independent and scored on a thread pool.
+    """
     start = pd.Timestamp(start_date)
     end = pd.Timestamp(end_date)
-    results = []
-
-    current = start
-    while current + timedelta(days=7) <= end:
-        pred_date = current.strftime("%Y-%m-%d")
-        actual_date = (current + timedelta(days=7)).strftime("%Y-%m-%d")
-
-        result = evaluate_prediction(ticker, pred_date, actual_date)
-        if "error" not in result:
-            results.append({
-                "date": pred_date,
-                "predicted": result["predicted"],
-                "actual": result["actual"],
-                "actual_return_pct": result["actual_return_pct"],
-                "hit": result["hit"],
-                "confidence": result["confidence"],
-                "composite_score": result.get("composite_score", 0),
-            })
-        current += timedelta(days=7)
-
-    df = pd.DataFrame(results)
-    if not df.empty:
-        accuracy = df["hit"].mean() * 100
-        logger.info(f"Backtest {ticker}: {len(df)} predictions, accuracy={accuracy:.1f}%")
+
+    try:
+        full = _download(
+            ticker,
+            (start - timedelta(days=LOOKBACK_DAYS)).strftime("%Y-%m-%d"),
+            (end + timedelta(days=1)).strftime("%Y-%m-%d"),
+        )
+    except Exception as e:
+        logger.error(f"Backtest download failed for {ticker}: {e}")
+        return pd.DataFrame()
+    if full.empty:
+        return pd.DataFrame()
+
+    close = full["Close"].squeeze()
+    if isinstance(close, pd.DataFrame):
+        close = close.iloc[:, 0]
+    prices = close.to_numpy(dtype=np.float64)
+
+    pred_dates = pd.date_range(start, end - timedelta(days=7), freq="7D")
+    # Outcome window is [pred_date, pred_date + 7d]: first bar on/after the
+    # prediction date to the last bar on/before the actual date
+    first = full.index.searchsorted(pred_dates, side="left")
+    last = full.index.searchsorted(pred_dates + timedelta(days=7), side="right") - 1
+    valid = last - first >= 1
+    pred_dates, first, last = pred_dates[valid], first[valid], last[valid]
+    if len(pred_dates) == 0:
+        return pd.DataFrame()
+
+    returns = (prices[last] / prices[first] - 1) * 100
+    actual = np.where(returns > 0.5, "UP", np.where(returns < -0.5, "DOWN", "FLAT"))
+
+    lookback_start = full.index.searchsorted(pred_dates - timedelta(days=LOOKBACK_DAYS), side="left")
+    history_end = full.index.searchsorted(pred_dates, side="right")
+    dates = pred_dates.strftime("%Y-%m-%d")
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(dates)))) as pool:
+        preds = list(pool.map(
+            lambda d, lo, hi: _predict_from_data(ticker, d, full.iloc[lo:hi]),
+            dates, lookback_start, history_end,
+        ))
+    predicted = np.array([p["direction"] for p in preds])
+
+    df = pd.DataFrame({
+        "date": list(dates),
+        "predicted": predicted,
+        "actual": actual,
+        "actual_return_pct": np.round(returns, 2),
+        "hit": predicted == actual,
+        "confidence": [p.get("confidence", 0) for p in preds],
+        "composite_score": [p.get("composite_score", 0) for p in preds],
+    })
+    accuracy = df["hit"].mean() * 100
+    logger.info(f"Backtest {ticker}: {len(df)} predictions, accuracy={accuracy:.1f}%")
     return df
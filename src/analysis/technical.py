@@ -6,8 +6,60 @@ from typing import Optional
 import numpy as np
 import pandas as pd
 
+from src.analysis import kernels
+from src.analysis.jit import njit, prange
+
+try:
+    from scipy.signal import lfilter
+except ImportError:
+    lfilter = None
+
 logger = logging.getLogger(__name__)
 
+# Longest series whose MACD EMAs go through scipy's lfilter; longer (or
+# NaN-containing) series use the JIT kernel
+LFILTER_MAX_LEN = 10_000
+
+
+def _ema_lfilter(x: np.ndarray, span: int) -> np.ndarray:
+    """``ewm(span=span, adjust=False).mean()`` for NaN-free input.
+
+    The adjust=False EMA is the first-order IIR filter
+    ``y[n] = a*x[n] + (1-a)*y[n-1]``; the initial state makes ``y[0] == x[0]``.
+    """
+    a = 2.0 / (span + 1)
+    return lfilter([a], [1.0, a - 1.0], x, zi=[x[0] * (1.0 - a)])[0]
+
+
+# Array-level indicator helpers shared by the calc_* wrappers, generate_signals
+# and the predictor's technical score
+def _rsi_np(close: np.ndarray, period: int) -> np.ndarray:
+    """RSI array for a float64 close array."""
+    return kernels.rsi(close, period)
+
+
+def _macd_np(close: np.ndarray, fast: int, slow: int, signal_period: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """MACD, signal and histogram arrays for a float64 close array."""
+    n = len(close)
+    if lfilter is None or n == 0 or n > LFILTER_MAX_LEN or np.isnan(close).any():
+        return kernels.macd(close, fast, slow, signal_period)
+    macd_line = _ema_lfilter(close, fast) - _ema_lfilter(close, slow)
+    signal_line = _ema_lfilter(macd_line, signal_period)
+    return macd_line, signal_line, macd_line - signal_line
+
+
+def _bollinger_np(close: np.ndarray, period: int, num_std: float) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Upper, middle and lower band arrays for a float64 close array."""
+    mean, std = kernels.rolling_mean_std(close, period)
+    return mean + num_std * std, mean, mean - num_std * std
+
+
+def _sma_last(close: np.ndarray, period: int) -> float:
+    """Latest value of ``rolling(period).mean()`` (NaN if too short)."""
+    if len(close) < period:
+        return np.nan
+    return float(close[-period:].mean())
+
 
 def calc_rsi(series: pd.Series, period: int = 14) -> pd.Series:
     """Calculate Relative Strength Index.
@@ -19,14 +71,8 @@ def calc_rsi(series: pd.Series, period: int = 14) -> pd.Series:
     Returns:
         RSI series (0-100).
     """
-    delta = series.diff()
-    gain = delta.where(delta > 0, 0.0)
-    loss = -delta.where(delta < 0, 0.0)
-    avg_gain = gain.ewm(alpha=1 / period, min_periods=period).mean()
-    avg_loss = loss.ewm(alpha=1 / period, min_periods=period).mean()
-    rs = avg_gain / avg_loss.replace(0, np.nan)
-    rsi = 100 - (100 / (1 + rs))
-    return rsi
+    rsi = _rsi_np(series.to_numpy(dtype=np.float64), period)
+    return pd.Series(rsi, index=series.index)
 
 
 def calc_macd(
@@ -40,12 +86,11 @@ def calc_macd(
     Returns:
         Tuple of (macd_line, signal_line, histogram).
     """
-    ema_fast = series.ewm(span=fast, adjust=False).mean()
-    ema_slow = series.ewm(span=slow, adjust=False).mean()
-    macd_line = ema_fast - ema_slow
-    signal_line = macd_line.ewm(span=signal_period, adjust=False).mean()
-    histogram = macd_line - signal_line
-    return macd_line, signal_line, histogram
+    macd_line, signal_line, histogram = _macd_np(
+        series.to_numpy(dtype=np.float64), fast, slow, signal_period
+    )
+    index = series.index
+    return pd.Series(macd_line, index=index), pd.Series(signal_line, index=index), pd.Series(histogram, index=index)
 
 
 def calc_bollinger(
@@ -58,11 +103,9 @@ def calc_bollinger(
     Returns:
         Tuple of (upper, middle, lower).
     """
-    middle = series.rolling(window=period).mean()
-    std = series.rolling(window=period).std()
-    upper = middle + num_std * std
-    lower = middle - num_std * std
-    return upper, middle, lower
+    upper, middle, lower = _bollinger_np(series.to_numpy(dtype=np.float64), period, num_std)
+    index = series.index
+    return pd.Series(upper, index=index), pd.Series(middle, index=index), pd.Series(lower, index=index)
 
 
 def calc_moving_averages(
@@ -76,7 +119,24 @@ def calc_moving_averages(
     """
     if periods is None:
         periods = [5, 25, 75]
-    return {p: series.rolling(window=p).mean() for p in periods}
+    # One cumulative sum serves every period: a window's sum is the difference
+    # of two prefix sums. NaNs count as zero in the sums and a parallel count of
+    # valid values marks windows that contain one.
+    x = series.to_numpy(dtype=np.float64)
+    n = len(x)
+    valid = ~np.isnan(x)
+    cs = np.concatenate(([0.0], np.cumsum(np.where(valid, x, 0.0))))
+    counts = np.concatenate(([0], np.cumsum(valid)))
+    index = series.index
+    out = {}
+    for p in periods:
+        ma = np.full(n, np.nan)
+        if 0 < p <= n:
+            window_sum = cs[p:] - cs[:-p]
+            full = counts[p:] - counts[:-p] == p
+            ma[p - 1:] = np.where(full, window_sum / p, np.nan)
+        out[p] = pd.Series(ma, index=index)
+    return out
 
 
 def generate_signals(df: pd.DataFrame) -> dict:
@@ -91,53 +151,72 @@ def generate_signals(df: pd.DataFrame) -> dict:
     if isinstance(close, pd.DataFrame):
         close = close.iloc[:, 0]
 
+    # Indicators stay raw ndarrays; only the latest values are needed
+    close_np = close.to_numpy(dtype=np.float64)
+    rsi = _rsi_np(close_np, 14)
+    macd_line, signal_line, _ = _macd_np(close_np, 12, 26, 9)
+    upper, _, lower = _bollinger_np(close_np, 20, 2.0)
+    return _build_signals(
+        close_np[-1],
+        rsi[-1],
+        macd_line[-1], signal_line[-1],
+        macd_line[-2], signal_line[-2],
+        upper[-1], lower[-1],
+        _sma_last(close_np, 5), _sma_last(close_np, 25),
+    )
+
+
+def _build_signals(last, rsi_val, macd_val, sig_val, macd_prev, sig_prev,
+                   upper_val, lower_val, ma5, ma25) -> dict:
+    """Signal dict from the latest indicator values (see generate_signals)."""
     signals: dict = {}
-    last = close.iloc[-1]
+    buy_count = 0
+    sell_count = 0
+
+    def emit(key: str, signal: str, reason: str, value=None) -> None:
+        nonlocal buy_count, sell_count
+        if value is None:
+            signals[key] = {"signal": signal, "reason": reason}
+        else:
+            signals[key] = {"value": value, "signal": signal, "reason": reason}
+        buy_count += signal == "BUY"
+        sell_count += signal == "SELL"
 
     # RSI
-    rsi = calc_rsi(close)
-    rsi_val = rsi.iloc[-1]
+    rsi_rounded = round(rsi_val, 2)
     if rsi_val < 30:
-        signals["rsi"] = {"value": round(rsi_val, 2), "signal": "BUY", "reason": "Oversold"}
+        emit("rsi", "BUY", "Oversold", value=rsi_rounded)
     elif rsi_val > 70:
-        signals["rsi"] = {"value": round(rsi_val, 2), "signal": "SELL", "reason": "Overbought"}
+        emit("rsi", "SELL", "Overbought", value=rsi_rounded)
     else:
-        signals["rsi"] = {"value": round(rsi_val, 2), "signal": "HOLD", "reason": "Neutral"}
+        emit("rsi", "HOLD", "Neutral", value=rsi_rounded)
 
     # MACD
-    macd_line, signal_line, hist = calc_macd(close)
-    macd_val = macd_line.iloc[-1]
-    sig_val = signal_line.iloc[-1]
-    if macd_val > sig_val and macd_line.iloc[-2] <= signal_line.iloc[-2]:
-        signals["macd"] = {"value": round(macd_val, 4), "signal": "BUY", "reason": "Bullish crossover"}
-    elif macd_val < sig_val and macd_line.iloc[-2] >= signal_line.iloc[-2]:
-        signals["macd"] = {"value": round(macd_val, 4), "signal": "SELL", "reason": "Bearish crossover"}
+    macd_rounded = round(macd_val, 4)
+    above = macd_val > sig_val
+    if above and macd_prev <= sig_prev:
+        emit("macd", "BUY", "Bullish crossover", value=macd_rounded)
+    elif macd_val < sig_val and macd_prev >= sig_prev:
+        emit("macd", "SELL", "Bearish crossover", value=macd_rounded)
     else:
-        direction = "above" if macd_val > sig_val else "below"
-        signals["macd"] = {"value": round(macd_val, 4), "signal": "HOLD", "reason": f"MACD {direction} signal"}
+        direction = "above" if above else "below"
+        emit("macd", "HOLD", f"MACD {direction} signal", value=macd_rounded)
 
     # Bollinger Bands
-    upper, middle, lower = calc_bollinger(close)
-    if last <= lower.iloc[-1]:
-        signals["bollinger"] = {"signal": "BUY", "reason": "Price at lower band"}
-    elif last >= upper.iloc[-1]:
-        signals["bollinger"] = {"signal": "SELL", "reason": "Price at upper band"}
+    if last <= lower_val:
+        emit("bollinger", "BUY", "Price at lower band")
+    elif last >= upper_val:
+        emit("bollinger", "SELL", "Price at upper band")
     else:
-        signals["bollinger"] = {"signal": "HOLD", "reason": "Price within bands"}
+        emit("bollinger", "HOLD", "Price within bands")
 
     # Moving averages (5 vs 25)
-    mas = calc_moving_averages(close)
-    if 5 in mas and 25 in mas:
-        ma5 = mas[5].iloc[-1]
-        ma25 = mas[25].iloc[-1]
-        if ma5 > ma25:
-            signals["ma_cross"] = {"signal": "BUY", "reason": f"MA5({ma5:.2f}) > MA25({ma25:.2f})"}
-        else:
-            signals["ma_cross"] = {"signal": "SELL", "reason": f"MA5({ma5:.2f}) < MA25({ma25:.2f})"}
+    if ma5 > ma25:
+        emit("ma_cross", "BUY", f"MA5({ma5:.2f}) > MA25({ma25:.2f})")
+    else:
+        emit("ma_cross", "SELL", f"MA5({ma5:.2f}) < MA25({ma25:.2f})")
 
-    # Overall signal (majority vote)
-    buy_count = sum(1 for s in signals.values() if s["signal"] == "BUY")
-    sell_count = sum(1 for s in signals.values() if s["signal"] == "SELL")
+    # Overall signal (majority vote over the counts kept by emit)
     total = len(signals)
     if buy_count > sell_count and buy_count > total / 3:
         overall = "BUY"
@@ -148,3 +227,91 @@ def generate_signals(df: pd.DataFrame) -> dict:
 
     signals["overall"] = {"signal": overall, "buy_count": buy_count, "sell_count": sell_count, "total": total}
     return signals
+
+
+@njit(cache=True, parallel=True)
+def _latest_values(close, starts):
+    """Latest indicator values for each row of a right-aligned close matrix.
+
+    Row i holds one ticker's bars in columns [starts[i], n_bars). Returns an
+    (n_tickers, 10) array in _build_signals argument order; rows with fewer
+    than two bars are NaN.
+    """
+    n_tick = close.shape[0]
+    out = np.full((n_tick, 10), np.nan)
+    for i in prange(n_tick):
+        row = close[i, starts[i]:]
+        n = len(row)
+        if n < 2:
+            continue
+        macd_line, signal_line, _ = kernels.macd(row, 12, 26, 9)
+        mean, std = kernels.rolling_mean_std(row, 20)
+        out[i, 0] = row[-1]
+        out[i, 1] = kernels.rsi(row, 14)[-1]
+        out[i, 2] = macd_line[-1]
+        out[i, 3] = signal_line[-1]
+        out[i, 4] = macd_line[-2]
+        out[i, 5] = signal_line[-2]
+        out[i, 6] = mean[-1] + 2.0 * std[-1]
+        out[i, 7] = mean[-1] - 2.0 * std[-1]
+        if n >= 5:
+            out[i, 8] = row[-5:].mean()
+        if n >= 25:
+            out[i, 9] = row[-25:].mean()
+    return out
+
+
+def _extract_close_matrix(prices: pd.DataFrame, tickers: list[str]) -> tuple[np.ndarray, np.ndarray, list[str]]:
+    """Pack each ticker's complete bars into one C-contiguous float64 matrix.
+
+    Rows are right-aligned so the latest bar is the last column; ``starts``
+    gives each row's first bar. Tickers missing from ``prices`` or whose
+    Close column cannot be read are dropped.
+    """
+    available = set(prices.columns.get_level_values(0))
+    columns = []
+    kept = []
+    for t in tickers:
+        if t not in available:
+            continue
+        try:
+            col = prices[t].dropna()["Close"].to_numpy(dtype=np.float64)
+        except Exception as e:
+            logger.error(f"Analysis failed for {t}: {e}")
+            continue
+        if len(col):
+            columns.append(col)
+            kept.append(t)
+    width = max((len(c) for c in columns), default=0)
+    close = np.full((len(columns), width), np.nan)
+    starts = np.empty(len(columns), dtype=np.int64)
+    for i, col in enumerate(columns):
+        starts[i] = width - len(col)
+        close[i, starts[i]:] = col
+    return close, starts, kept
+
+
+def generate_signals_batch(prices: pd.DataFrame, tickers: list[str]) -> dict[str, dict]:
+    """Generate signals for many tickers from a ``fetch_prices`` frame.
+
+    Equivalent to calling generate_signals on ``prices[ticker].dropna()``
+    for each ticker, but the indicators for all tickers are computed in one
+    kernel call over a (ticker x bar) close matrix.
+
+    Returns:
+        Dict mapping ticker -> signals; tickers without data, or whose
+        analysis fails, are omitted (failures are logged per ticker).
+    """
+    close, starts, kept = _extract_close_matrix(prices, tickers)
+    if not kept:
+        return {}
+    latest = _latest_values(close, starts)
+    results = {}
+    for t, row, start in zip(kept, latest, starts):
+        if close.shape[1] - start < 2:
+            continue
+        try:
+            results[t] = _build_signals(*row)
+        except Exception as e:
+            logger.error(f"Analysis failed for {t}: {e}")
+    return results
@@ -1,17 +1,18 @@
 """Crypto market data fetcher using public APIs (no keys required)."""
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
-import requests
+from src.utils.http import http_get
+from src.utils.ttl_cache import ttl_cache
 
 logger = logging.getLogger(__name__)
 
-_HEADERS = {"User-Agent": "Mozilla/5.0 (SENTINEL-v2)"}
-_TIMEOUT = 15
 _CG_BASE = "https://api.coingecko.com/api/v3"
 
 
+@ttl_cache(ttl=30)
 def _coingecko_price(coin_id: str) -> Optional[dict]:
     """Fetch price data from CoinGecko for a single coin.
 
@@ -26,7 +27,7 @@ def _coingecko_price(coin_id: str) -> Optional[dict]:
             "include_24hr_change": "true",
             "include_market_cap": "true",
         }
-        resp = requests.get(url, params=params, headers=_HEADERS, timeout=_TIMEOUT)
+        resp = http_get(url, params=params)
         resp.raise_for_status()
         data = resp.json().get(coin_id, {})
         return {
@@ -49,6 +50,7 @@ def fetch_wld_price() -> Optional[dict]:
     return _coingecko_price("worldcoin-wld")
 
 
+@ttl_cache(ttl=300)
 def fetch_btc_fear_greed() -> Optional[dict]:
     """Fetch Bitcoin Fear & Greed Index from alternative.me.
 
@@ -57,7 +59,7 @@ def fetch_btc_fear_greed() -> Optional[dict]:
     """
     try:
         url = "https://api.alternative.me/fng/?limit=1"
-        resp = requests.get(url, headers=_HEADERS, timeout=_TIMEOUT)
+        resp = http_get(url)
         resp.raise_for_status()
         entry = resp.json().get("data", [{}])[0]
         return {
@@ -70,9 +72,13 @@ def fetch_btc_fear_greed() -> Optional[dict]:
 
 
 def fetch_crypto_snapshot() -> dict:
-    """Fetch all crypto indicators."""
+    """Fetch all crypto indicators, one request per indicator in parallel."""
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        btc = pool.submit(fetch_btc_price)
+        wld = pool.submit(fetch_wld_price)
+        btc_fear_greed = pool.submit(fetch_btc_fear_greed)
     return {
-        "btc": fetch_btc_price(),
-        "wld": fetch_wld_price(),
-        "btc_fear_greed": fetch_btc_fear_greed(),
+        "btc": btc.result(),
+        "wld": wld.result(),
+        "btc_fear_greed": btc_fear_greed.result(),
     }
@@ -1,11 +1,20 @@
 """Market data fetcher using Yahoo Finance API."""
 
 import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
 import pandas as pd
 import yfinance as yf
-import requests
+
+from src.utils.http import http_get
+from src.utils.ttl_cache import ttl_cache
+
+try:
+    import lxml.html as lxml_html
+except ImportError:
+    lxml_html = None
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +29,19 @@ BONDS = ["^TNX"]  # US 10Y Treasury
 
 ALL_TICKERS = US_STOCKS + JP_STOCKS + CRYPTO + COMMODITIES + INDICES + FX + BONDS
 
+# Seconds a yf.Ticker (and the quote its fast_info caches) is reused
+TICKER_TTL = 60
+
+
+@ttl_cache(ttl=TICKER_TTL, maxsize=256)
+def get_ticker(symbol: str) -> yf.Ticker:
+    """Shared yf.Ticker for a symbol, rebuilt every TICKER_TTL seconds.
+
+    fast_info memoizes its values on the Ticker, so the TTL also bounds how
+    stale a quote read through it can be.
+    """
+    return yf.Ticker(symbol)
+
 
 def fetch_prices(
     tickers: list[str],
@@ -47,33 +69,67 @@ def fetch_prices(
         return pd.DataFrame()
 
 
-def fetch_current_snapshot(tickers: list[str]) -> dict:
+def _fetch_snapshot_one(ticker: str) -> Optional[dict]:
+    """Price snapshot for a single ticker, or None if unavailable."""
+    try:
+        t = get_ticker(ticker)
+        info = t.fast_info
+        price = getattr(info, "last_price", None)
+        prev = getattr(info, "previous_close", None)
+        if price is not None:
+            change = (price - prev) if prev else 0.0
+            change_pct = (change / prev * 100) if prev else 0.0
+            return {
+                "price": round(price, 4),
+                "prev_close": round(prev, 4) if prev else None,
+                "change": round(change, 4),
+                "change_pct": round(change_pct, 2),
+            }
+        logger.warning(f"No price for {ticker}")
+    except Exception as e:
+        logger.error(f"Failed to fetch snapshot for {ticker}: {e}")
+    return None
+
+
+def fetch_current_snapshot(tickers: list[str], max_workers: int = 16) -> dict:
     """Fetch current price snapshot for given tickers.
 
+    Each ticker is a separate HTTP round trip, so they are fetched on a
+    thread pool.
+
     Returns:
         Dict mapping ticker -> {price, change, change_pct, volume, name}.
     """
-    snapshot: dict = {}
-    for ticker in tickers:
+    if not tickers:
+        return {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tickers)))) as pool:
+        results = pool.map(_fetch_snapshot_one, tickers)
+    return {t: snap for t, snap in zip(tickers, results) if snap is not None}
+
+
+# First number rendered in a StyledNumber element (the quote price)
+_NAV_RE = re.compile(r'class="[^"]*StyledNumber[^"]*"[^>]*>([0-9,]+)')
+_NAV_NUMBER_RE = re.compile(r"[0-9,]+")
+_NAV_XPATH = '//*[contains(@class, "StyledNumber")]/text()[1]'
+
+
+def _parse_yahoo_nav(html: str) -> Optional[float]:
+    """Extract the NAV from a Yahoo Finance Japan quote page.
+
+    Uses lxml when installed and falls back to the regex scan.
+    """
+    if lxml_html is not None:
         try:
-            t = yf.Ticker(ticker)
-            info = t.fast_info
-            price = getattr(info, "last_price", None)
-            prev = getattr(info, "previous_close", None)
-            if price is not None:
-                change = (price - prev) if prev else 0.0
-                change_pct = (change / prev * 100) if prev else 0.0
-                snapshot[ticker] = {
-                    "price": round(price, 4),
-                    "prev_close": round(prev, 4) if prev else None,
-                    "change": round(change, 4),
-                    "change_pct": round(change_pct, 2),
-                }
-            else:
-                logger.warning(f"No price for {ticker}")
+            for text in lxml_html.fromstring(html).xpath(_NAV_XPATH):
+                match = _NAV_NUMBER_RE.match(text)
+                if match:
+                    return float(match.group(0).replace(",", ""))
         except Exception as e:
-            logger.error(f"Failed to fetch snapshot for {ticker}: {e}")
-    return snapshot
+            logger.debug(f"lxml NAV parse failed, using regex: {e}")
+    match = _NAV_RE.search(html)
+    if match:
+        return float(match.group(1).replace(",", ""))
+    return None
 
 
 def fetch_fund_nav_yahoo(fund_code: str) -> Optional[float]:
@@ -88,13 +144,11 @@ def fetch_fund_nav_yahoo(fund_code: str) -> Optional[float]:
     try:
         url = f"https://finance.yahoo.co.jp/quote/{fund_code}"
         headers = {"User-Agent": "Mozilla/5.0"}
-        resp = requests.get(url, headers=headers, timeout=10)
+        resp = http_get(url, headers=headers, timeout=10)
         if resp.status_code == 200 and "基準価額" in resp.text:
-            # Simple extraction - look for price pattern
-            import re
-            match = re.search(r'class="[^"]*StyledNumber[^"]*"[^>]*>([0-9,]+)', resp.text)
-            if match:
-                return float(match.group(1).replace(",", ""))
+            nav = _parse_yahoo_nav(resp.text)
+            if nav is not None:
+                return nav
         logger.warning(f"Could not parse NAV for fund {fund_code}")
         return None
     except Exception as e:
@@ -1,17 +1,19 @@
 """Macro economic data fetcher using public APIs (no keys required)."""
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
-import requests
 import yfinance as yf
 
-logger = logging.getLogger(__name__)
+from src.data.fetcher import get_ticker
+from src.utils.http import http_get
+from src.utils.ttl_cache import ttl_cache
 
-_HEADERS = {"User-Agent": "Mozilla/5.0 (SENTINEL-v2)"}
-_TIMEOUT = 15
+logger = logging.getLogger(__name__)
 
 
+@ttl_cache(ttl=300)
 def fetch_fear_greed_index() -> Optional[dict]:
     """Fetch CNN Fear & Greed Index via unofficial API.
 
@@ -20,7 +22,7 @@ def fetch_fear_greed_index() -> Optional[dict]:
     """
     try:
         url = "https://production.dataviz.cnn.io/index/fearandgreed/graphdata"
-        resp = requests.get(url, headers=_HEADERS, timeout=_TIMEOUT)
+        resp = http_get(url)
         resp.raise_for_status()
         data = resp.json()
         fg = data.get("fear_and_greed", {})
@@ -33,10 +35,32 @@ def fetch_fear_greed_index() -> Optional[dict]:
         return None
 
 
+# Yahoo symbols read by the macro fetchers; they are quoted in one batch
+_YF_SYMBOLS = ("^TNX", "DX-Y.NYB", "^VIX", "JPY=X", "^IRX")
+_QUOTE_TTL = 60  # seconds
+
+
+@ttl_cache(ttl=_QUOTE_TTL)
+def _batch_quotes() -> Optional[dict]:
+    """Last prices for _YF_SYMBOLS from a single download, or None on failure."""
+    try:
+        closes = yf.download(list(_YF_SYMBOLS), period="5d", progress=False)["Close"]
+        quotes = {}
+        for symbol in _YF_SYMBOLS:
+            col = closes[symbol].dropna() if symbol in closes.columns else ()
+            quotes[symbol] = round(float(col.iloc[-1]), 4) if len(col) else None
+        return quotes
+    except Exception as e:
+        logger.error(f"YF batch fetch failed: {e}")
+        return None
+
+
 def _yf_last_price(symbol: str) -> Optional[float]:
     """Helper: get last price from Yahoo Finance."""
+    if symbol in _YF_SYMBOLS:
+        return (_batch_quotes() or {}).get(symbol)
     try:
-        t = yf.Ticker(symbol)
+        t = get_ticker(symbol)
         price = getattr(t.fast_info, "last_price", None)
         return round(price, 4) if price is not None else None
     except Exception as e:
@@ -64,6 +88,7 @@ def fetch_usdjpy() -> Optional[float]:
     return _yf_last_price("JPY=X")
 
 
+@ttl_cache(ttl=3600)
 def fetch_cpi_latest() -> Optional[dict]:
     """Fetch latest CPI data from BLS API (no key required).
 
@@ -72,7 +97,7 @@ def fetch_cpi_latest() -> Optional[dict]:
     """
     try:
         url = "https://api.bls.gov/publicAPI/v1/timeseries/data/CUUR0000SA0"
-        resp = requests.get(url, headers=_HEADERS, timeout=_TIMEOUT)
+        resp = http_get(url)
         resp.raise_for_status()
         data = resp.json()
         series = data.get("Results", {}).get("series", [{}])[0]
@@ -94,13 +119,21 @@ def fetch_fed_funds_rate() -> Optional[float]:
 
 
 def macro_snapshot() -> dict:
-    """Fetch all macro indicators and return as a dict."""
+    """Fetch all macro indicators and return as a dict.
+
+    The Yahoo quotes come from one batched download; it runs concurrently
+    with the Fear & Greed and CPI requests.
+    """
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        fear_greed = pool.submit(fetch_fear_greed_index)
+        cpi = pool.submit(fetch_cpi_latest)
+        quotes = pool.submit(_batch_quotes).result() or {}
     return {
-        "fear_greed": fetch_fear_greed_index(),
-        "us10y_yield": fetch_treasury_yield(),
-        "dollar_index": fetch_dollar_index(),
-        "vix": fetch_vix(),
-        "usdjpy": fetch_usdjpy(),
-        "cpi": fetch_cpi_latest(),
-        "fed_funds_rate": fetch_fed_funds_rate(),
+        "fear_greed": fear_greed.result(),
+        "us10y_yield": quotes.get("^TNX"),
+        "dollar_index": quotes.get("DX-Y.NYB"),
+        "vix": quotes.get("^VIX"),
+        "usdjpy": quotes.get("JPY=X"),
+        "cpi": cpi.result(),
+        "fed_funds_rate": quotes.get("^IRX"),
     }
@@ -2,37 +2,83 @@
 
 import logging
 from datetime import datetime
+from io import BytesIO
 from typing import Optional
+from urllib.parse import urlsplit
 from xml.etree import ElementTree
 
-import requests
+from src.utils.http import http_get
+
+try:
+    from lxml import etree as lxml_etree
+except ImportError:
+    lxml_etree = None
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
 
 logger = logging.getLogger(__name__)
 
-_HEADERS = {"User-Agent": "Mozilla/5.0 (SENTINEL-v2)"}
-_TIMEOUT = 15
+
+def _rss_item(item) -> Optional[dict]:
+    """{title, url, published} for an <item> element, or None if incomplete."""
+    title = item.findtext("title", "").strip()
+    link = item.findtext("link", "").strip()
+    if not (title and link):
+        return None
+    return {
+        "title": title,
+        "url": link,
+        "published": item.findtext("pubDate", "").strip(),
+    }
 
 
 def _parse_rss(xml_text: str) -> list[dict]:
-    """Parse RSS XML into list of {title, url, published}."""
+    """Parse RSS XML into list of {title, url, published}.
+
+    Streams <item> elements with lxml's iterparse when lxml is installed,
+    otherwise parses the whole document with ElementTree.
+    """
     items = []
+    if lxml_etree is not None:
+        try:
+            source = BytesIO(xml_text.encode("utf-8"))
+            for _, item in lxml_etree.iterparse(source, tag="item", resolve_entities=False):
+                entry = _rss_item(item)
+                if entry is not None:
+                    items.append(entry)
+                item.clear()
+        except lxml_etree.XMLSyntaxError as e:
+            logger.error(f"RSS parse error: {e}")
+            return []
+        return items
+
     try:
         root = ElementTree.fromstring(xml_text)
         for item in root.iter("item"):
-            title = item.findtext("title", "").strip()
-            link = item.findtext("link", "").strip()
-            pub_date = item.findtext("pubDate", "").strip()
-            if title and link:
-                items.append({
-                    "title": title,
-                    "url": link,
-                    "published": pub_date,
-                })
+            entry = _rss_item(item)
+            if entry is not None:
+                items.append(entry)
     except ElementTree.ParseError as e:
         logger.error(f"RSS parse error: {e}")
     return items
 
 
+def _canonical_url_key(url: str) -> int:
+    """Hash of a URL's lowercased host and path, ignoring query and fragment.
+
+    Tracking parameters make the same article show up under different URLs;
+    keying on host + path collapses them.
+    """
+    parts = urlsplit(url)
+    canonical = parts.netloc.lower() + parts.path
+    if xxhash is not None:
+        return xxhash.xxh64_intdigest(canonical)
+    return hash(canonical)
+
+
 def fetch_google_news(query: str, num: int = 10) -> list[dict]:
     """Fetch Google News RSS for a query.
 
@@ -46,7 +92,7 @@ def fetch_google_news(query: str, num: int = 10) -> list[dict]:
     try:
         url = "https://news.google.com/rss/search"
         params = {"q": query, "hl": "en-US", "gl": "US", "ceid": "US:en"}
-        resp = requests.get(url, params=params, headers=_HEADERS, timeout=_TIMEOUT)
+        resp = http_get(url, params=params)
         resp.raise_for_status()
         return _parse_rss(resp.text)[:num]
     except Exception as e:
@@ -65,12 +111,13 @@ def fetch_market_headlines(num: int = 10) -> list[dict]:
     for q in queries:
         all_items.extend(fetch_google_news(q, num=5))
 
-    # Deduplicate by URL
-    seen: set[str] = set()
+    # Deduplicate by canonical URL (original URL is kept in the output)
+    seen: set[int] = set()
     unique: list[dict] = []
     for item in all_items:
-        if item["url"] not in seen:
-            seen.add(item["url"])
+        key = _canonical_url_key(item["url"])
+        if key not in seen:
+            seen.add(key)
             unique.append(item)
 
     return unique[:num]
@@ -1,6 +1,7 @@
 """Discord-formatted report generation."""
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 from src.data.fetcher import ALL_TICKERS, US_STOCKS, CRYPTO, INDICES, fetch_current_snapshot
@@ -10,35 +11,54 @@ from src.portfolio.tracker import portfolio_snapshot
 
 logger = logging.getLogger(__name__)
 
+# Ticker groups shown in the daily summary
+_CATEGORIES = (
+    ("🇺🇸 US Stocks", tuple(US_STOCKS)),
+    ("🪙 Crypto", tuple(CRYPTO)),
+    ("📈 Indices", tuple(INDICES)),
+    ("💱 FX/Bonds/Gold", ("JPY=X", "^TNX", "GC=F")),
+    ("🇯🇵 Japan", ("6600.T",)),
+)
+# (prefix, ticker) rows in report order; the first row of each category is
+# prefixed with the category header line
+_FLAT_ORDER = tuple(
+    (f"\n**{cat}**\n" if i == 0 else "", t)
+    for cat, tickers in _CATEGORIES
+    for i, t in enumerate(tickers)
+)
+_ROW_FMT = "{emoji} `{ticker:8s}` {price:>10,.2f}  ({change_pct:+.2f}%)"
+_NA_ROW_FMT = "⚪ `{ticker:8s}` N/A"
+_DIRECTION_EMOJI = {"UP": "📈", "DOWN": "📉", "FLAT": "➡️"}
+
+
+def _market_row(ticker: str, snap: dict | None) -> str:
+    """One summary line for a ticker's snapshot entry (or N/A)."""
+    if snap is None:
+        return _NA_ROW_FMT.format(ticker=ticker)
+    emoji = "🟢" if snap["change_pct"] >= 0 else "🔴"
+    return _ROW_FMT.format(emoji=emoji, ticker=ticker, price=snap["price"], change_pct=snap["change_pct"])
+
 
 def daily_market_summary() -> str:
-    """Generate daily market summary for Discord."""
+    """Generate daily market summary for Discord.
+
+    The price, macro and crypto sources are independent network fetches, so
+    they run concurrently and the report is built once all three are back.
+    """
     now = datetime.now().strftime("%Y-%m-%d %H:%M")
-    snapshot = fetch_current_snapshot(ALL_TICKERS)
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        snapshot_future = pool.submit(fetch_current_snapshot, ALL_TICKERS)
+        macro_future = pool.submit(macro_snapshot)
+        crypto_future = pool.submit(fetch_crypto_snapshot)
+    snapshot = snapshot_future.result()
 
     lines = [f"📊 **SENTINEL Market Summary** — {now}\n"]
 
     # Group by category
-    categories = {
-        "🇺🇸 US Stocks": US_STOCKS,
-        "🪙 Crypto": CRYPTO,
-        "📈 Indices": INDICES,
-        "💱 FX/Bonds/Gold": ["JPY=X", "^TNX", "GC=F"],
-        "🇯🇵 Japan": ["6600.T"],
-    }
-
-    for cat_name, tickers in categories.items():
-        lines.append(f"\n**{cat_name}**")
-        for t in tickers:
-            if t in snapshot:
-                s = snapshot[t]
-                emoji = "🟢" if s["change_pct"] >= 0 else "🔴"
-                lines.append(f"{emoji} `{t:8s}` {s['price']:>10,.2f}  ({s['change_pct']:+.2f}%)")
-            else:
-                lines.append(f"⚪ `{t:8s}` N/A")
+    lines.extend(prefix + _market_row(t, snapshot.get(t)) for prefix, t in _FLAT_ORDER)
 
     # Macro indicators
-    macro = macro_snapshot()
+    macro = macro_future.result()
     lines.append("\n**🏛️ Macro Indicators**")
     fg = macro.get("fear_greed")
     if fg:
@@ -58,7 +78,7 @@ def daily_market_summary() -> str:
         lines.append(f"• CPI: **{cpi['value']}** ({cpi.get('periodName', '')} {cpi.get('year', '')})")
 
     # Crypto snapshot
-    crypto_snap = fetch_crypto_snapshot()
+    crypto_snap = crypto_future.result()
     lines.append("\n**🪙 Crypto Overview**")
     for label, key in [("BTC", "btc"), ("WLD", "wld")]:
         coin = crypto_snap.get(key)
@@ -83,7 +103,7 @@ def prediction_report(predictions: list[dict]) -> str:
         ticker = p.get("ticker", "?")
         direction = p.get("direction", "?")
         confidence = p.get("confidence", 0)
-        emoji = {"UP": "📈", "DOWN": "📉", "FLAT": "➡️"}.get(direction, "❓")
+        emoji = _DIRECTION_EMOJI.get(direction, "❓")
         lines.append(f"{emoji} **{ticker}**: {direction} (confidence: {confidence}%)")
         reasons = p.get("reasoning", [])
         if reasons:
@@ -1,17 +1,24 @@
 """Paper trading engine with JSON persistence."""
 
-import json
 import logging
+import os
+import time
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
+import orjson
 import yfinance as yf
 
+from src.data.fetcher import get_ticker
+
 logger = logging.getLogger(__name__)
 
 DEFAULT_STATE_PATH = Path(__file__).parent.parent.parent / "data" / "paper_portfolio.json"
 
+# Seconds get_pnl reuses its last unrealized P&L before repricing positions
+UNREALIZED_TTL = 5.0
+
 
 class PaperTrader:
     """Simulated trading engine with virtual cash."""
@@ -20,17 +27,35 @@ class PaperTrader:
         self.cash: float = initial_cash
         self.positions: dict[str, dict] = {}  # ticker -> {shares, avg_cost}
         self.transactions: list[dict] = []
+        self._realized_pnl: float = 0.0
+        # (monotonic time, unrealized P&L); cleared whenever positions change
+        self._unrealized_cache: Optional[tuple[float, float]] = None
 
     def _get_price(self, ticker: str) -> Optional[float]:
         """Fetch current market price for a ticker."""
         try:
-            t = yf.Ticker(ticker)
+            t = get_ticker(ticker)
             price = getattr(t.fast_info, "last_price", None)
             return float(price) if price is not None else None
         except Exception as e:
             logger.error(f"Failed to get price for {ticker}: {e}")
             return None
 
+    def _get_prices(self, tickers: list[str]) -> dict[str, Optional[float]]:
+        """Fetch current prices for several tickers with one download."""
+        if not tickers:
+            return {}
+        try:
+            closes = yf.download(tickers, period="5d", progress=False)["Close"]
+        except Exception as e:
+            logger.error(f"Failed to get prices for {tickers}: {e}")
+            return {t: None for t in tickers}
+        prices: dict[str, Optional[float]] = {}
+        for ticker in tickers:
+            col = closes[ticker].dropna() if ticker in closes.columns else ()
+            prices[ticker] = float(col.iloc[-1]) if len(col) else None
+        return prices
+
     def buy(self, ticker: str, shares: int, price: Optional[float] = None) -> dict:
         """Buy shares of a ticker.
 
@@ -69,6 +94,7 @@ class PaperTrader:
             "timestamp": datetime.now().isoformat(),
         }
         self.transactions.append(txn)
+        self._unrealized_cache = None
         logger.info(f"BUY {shares} {ticker} @ ${price:.2f} = ${cost:.2f}")
         return txn
 
@@ -110,6 +136,8 @@ class PaperTrader:
             "timestamp": datetime.now().isoformat(),
         }
         self.transactions.append(txn)
+        self._realized_pnl += txn["pnl"]
+        self._unrealized_cache = None
         logger.info(f"SELL {shares} {ticker} @ ${price:.2f} = ${proceeds:.2f} (PnL: ${pnl:.2f})")
         return txn
 
@@ -117,8 +145,9 @@ class PaperTrader:
         """Get current portfolio state with market values."""
         positions_detail = {}
         total_value = self.cash
+        prices = self._get_prices(list(self.positions))
         for ticker, pos in self.positions.items():
-            current = self._get_price(ticker)
+            current = prices.get(ticker)
             mkt_val = current * pos["shares"] if current else 0
             total_value += mkt_val
             positions_detail[ticker] = {
@@ -136,12 +165,18 @@ class PaperTrader:
 
     def get_pnl(self) -> dict:
         """Calculate realized and unrealized P&L."""
-        realized = sum(t.get("pnl", 0) for t in self.transactions if t["type"] == "SELL")
-        unrealized = 0.0
-        for ticker, pos in self.positions.items():
-            current = self._get_price(ticker)
-            if current:
-                unrealized += (current - pos["avg_cost"]) * pos["shares"]
+        realized = self._realized_pnl
+        now = time.monotonic()
+        if self._unrealized_cache is not None and now - self._unrealized_cache[0] < UNREALIZED_TTL:
+            unrealized = self._unrealized_cache[1]
+        else:
+            unrealized = 0.0
+            prices = self._get_prices(list(self.positions))
+            for ticker, pos in self.positions.items():
+                current = prices.get(ticker)
+                if current:
+                    unrealized += (current - pos["avg_cost"]) * pos["shares"]
+            self._unrealized_cache = (now, unrealized)
         return {
             "realized_pnl": round(realized, 2),
             "unrealized_pnl": round(unrealized, 2),
@@ -157,7 +192,11 @@ class PaperTrader:
             "positions": self.positions,
             "transactions": self.transactions,
         }
-        p.write_text(json.dumps(state, indent=2, default=str))
+        data = orjson.dumps(state, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY, default=str)
+        # Write then rename so a crash mid-write never leaves a truncated state file
+        tmp = p.with_name(p.name + ".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, p)
         logger.info(f"State saved to {p}")
 
     def load_state(self, path: Optional[str] = None) -> None:
@@ -166,8 +205,10 @@ class PaperTrader:
         if not p.exists():
             logger.warning(f"No state file at {p}")
             return
-        state = json.loads(p.read_text())
+        state = orjson.loads(p.read_bytes())
         self.cash = state.get("cash", 100_000.0)
         self.positions = state.get("positions", {})
         self.transactions = state.get("transactions", [])
+        self._realized_pnl = sum(t.get("pnl", 0) for t in self.transactions if t["type"] == "SELL")
+        self._unrealized_cache = None
         logger.info(f"State loaded from {p}")
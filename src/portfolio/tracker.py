@@ -1,45 +1,146 @@
 """Portfolio tracker for Japanese mutual funds."""
 
+import codecs
 import logging
 import re
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
-import requests
+from src.utils.http import http_get
+from src.utils.ttl_cache import ttl_cache
+
+try:
+    import lxml.html as lxml_html
+except ImportError:
+    lxml_html = None
 
 logger = logging.getLogger(__name__)
 
-# Nicolas's fund portfolio
-FUNDS = {
-    "03311187": "eMAXIS Slim 米国株式(S&P500)",
-    "04311181": "iFreeNEXT FANG+インデックス",
-    "04312257": "iFreeNEXT 全世界半導体株インデックス",
-    "9I312261": "楽天・ゴールド・ファンド",
-}
+_HEADERS = {"User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)"}
+
+# Fund NAVs are published once per business day
+NAV_TTL = 3600
+
+# NAV patterns: Minkabu's price element, Minkabu's 基準価額 label, Yahoo JP quote
+_MINKABU_FSI = re.compile(r'class="[^"]*fsi[^"]*"[^>]*>([0-9,]+)')
+_MINKABU_KIJUN = re.compile(r'基準価額[^0-9]*([0-9,]+)\s*円')
+_YAHOO_NAV = re.compile(r'>([0-9,]+)</span>\s*円')
+_NAV_NUMBER = re.compile(r"[0-9,]+")
+
+# DOM equivalents of the Minkabu price and Yahoo quote patterns, tried on the
+# full page when lxml is installed and the streamed regex found nothing
+_MINKABU_FSI_XPATH = '//*[contains(@class, "fsi")]'
+_YAHOO_NAV_XPATH = '//span[starts-with(normalize-space(following-sibling::node()[1][self::text()]), "円")]'
 
+# Bytes read per step while scanning a streamed quote page
+_STREAM_CHUNK = 16 * 1024
+# Characters of already-scanned text re-searched with each new chunk
+_STREAM_OVERLAP = 1024
 
-def fetch_fund_nav(fund_code: str) -> Optional[float]:
+# Nicolas's fund portfolio as (code, name) pairs in report order
+FUNDS = (
+    ("03311187", "eMAXIS Slim 米国株式(S&P500)"),
+    ("04311181", "iFreeNEXT FANG+インデックス"),
+    ("04312257", "iFreeNEXT 全世界半導体株インデックス"),
+    ("9I312261", "楽天・ゴールド・ファンド"),
+)
+FUNDS_DICT = dict(FUNDS)
+
+
+def fetch_fund_nav(fund_code: str, force_refresh: bool = False) -> Optional[float]:
     """Fetch latest NAV for a Japanese mutual fund.
 
-    Tries Yahoo Finance Japan and Minkabu as sources.
+    Tries Yahoo Finance Japan and Minkabu as sources. Successful lookups are
+    reused for NAV_TTL seconds.
 
     Args:
         fund_code: Fund code (e.g. '03311187').
+        force_refresh: Skip the cached value and refetch.
 
     Returns:
         NAV as float or None if unavailable.
     """
-    headers = {"User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)"}
+    if force_refresh:
+        _fetch_fund_nav.cache_discard(fund_code)
+    return _fetch_fund_nav(fund_code)
+
+
+def _fetch_until(url: str, pattern: re.Pattern) -> tuple[Optional[str], Optional[re.Match]]:
+    """GET a page, reading the body only until ``pattern`` matches.
+
+    The connection is closed as soon as a match is found, so the rest of the
+    page is never downloaded or decoded.
+
+    Returns:
+        (text read so far, match or None); text is None on a non-200 response.
+    """
+    with http_get(url, headers=_HEADERS, timeout=10, stream=True) as resp:
+        if resp.status_code != 200:
+            return None, None
+        decoder = codecs.getincrementaldecoder(resp.encoding or "utf-8")(errors="replace")
+        text = ""
+        for chunk in resp.iter_content(chunk_size=_STREAM_CHUNK):
+            # Only rescan the new chunk plus enough of the old tail to catch a
+            # match straddling the boundary
+            pos = max(0, len(text) - _STREAM_OVERLAP)
+            text += decoder.decode(chunk)
+            match = pattern.search(text, pos)
+            # A match that reaches the end of the buffer may be a number cut
+            # off at the chunk boundary
+            if match and match.end() < len(text):
+                return text, match
+        text += decoder.decode(b"", final=True)
+        return text, pattern.search(text)
+
+
+def _parse_jp_number(text: str) -> float:
+    """Parse a number with thousands separators, e.g. '12,345' -> 12345.0.
+
+    str.replace is the fastest way to drop the separators here: on short
+    strings it beats both str.translate and a per-digit accumulation loop.
+    """
+    return float(text.replace(",", ""))
+
+
+def _match_nav(match: Optional[re.Match]) -> Optional[float]:
+    """NAV from a pattern match's first group, or None."""
+    if match is None:
+        return None
+    return _parse_jp_number(match.group(1))
+
 
+def _dom_nav(text: str, xpath: str) -> Optional[float]:
+    """First number leading the text of an element matched by ``xpath``.
+
+    Returns None when lxml is not installed or nothing matches.
+    """
+    if lxml_html is None:
+        return None
+    try:
+        for node in lxml_html.fromstring(text).xpath(xpath):
+            match = _NAV_NUMBER.match(node.text_content().strip())
+            if match:
+                return _parse_jp_number(match.group(0))
+    except Exception as e:
+        logger.debug(f"lxml NAV parse failed: {e}")
+    return None
+
+
+@ttl_cache(ttl=NAV_TTL)
+def _fetch_fund_nav(fund_code: str) -> Optional[float]:
+    """Uncached NAV lookup behind fetch_fund_nav."""
     # Try Minkabu (itf.minkabu.jp)
     try:
         url = f"https://itf.minkabu.jp/fund/{fund_code}"
-        resp = requests.get(url, headers=headers, timeout=10)
-        if resp.status_code == 200:
-            match = re.search(r'class="[^"]*fsi[^"]*"[^>]*>([0-9,]+)', resp.text)
-            if not match:
-                match = re.search(r'基準価額[^0-9]*([0-9,]+)\s*円', resp.text)
-            if match:
-                nav = float(match.group(1).replace(",", ""))
+        text, match = _fetch_until(url, _MINKABU_FSI)
+        if text is not None:
+            nav = _match_nav(match)
+            # Without a match there was no early exit, so text is the whole page
+            if nav is None:
+                nav = _dom_nav(text, _MINKABU_FSI_XPATH)
+            if nav is None:
+                nav = _match_nav(_MINKABU_KIJUN.search(text))
+            if nav is not None:
                 logger.info(f"Fund {fund_code} NAV: {nav}")
                 return nav
     except Exception as e:
@@ -48,11 +149,12 @@ def fetch_fund_nav(fund_code: str) -> Optional[float]:
     # Try Yahoo Finance JP
     try:
         url = f"https://finance.yahoo.co.jp/quote/{fund_code}"
-        resp = requests.get(url, headers=headers, timeout=10)
-        if resp.status_code == 200:
-            match = re.search(r'>([0-9,]+)</span>\s*円', resp.text)
-            if match:
-                nav = float(match.group(1).replace(",", ""))
+        text, match = _fetch_until(url, _YAHOO_NAV)
+        if text is not None:
+            nav = _match_nav(match)
+            if nav is None:
+                nav = _dom_nav(text, _YAHOO_NAV_XPATH)
+            if nav is not None:
                 logger.info(f"Fund {fund_code} NAV (Yahoo): {nav}")
                 return nav
     except Exception as e:
@@ -65,15 +167,20 @@ def fetch_fund_nav(fund_code: str) -> Optional[float]:
 def portfolio_snapshot() -> dict:
     """Fetch NAV for all tracked funds.
 
+    Each fund is a separate blocking HTTP lookup, so they run on a thread
+    pool.
+
     Returns:
         Dict mapping fund_code -> {name, nav, status}.
     """
-    result = {}
-    for code, name in FUNDS.items():
-        nav = fetch_fund_nav(code)
-        result[code] = {
+    codes = [code for code, _ in FUNDS]
+    with ThreadPoolExecutor(max_workers=len(FUNDS)) as pool:
+        navs = pool.map(fetch_fund_nav, codes)
+    return {
+        code: {
             "name": name,
             "nav": nav,
             "status": "ok" if nav is not None else "error",
         }
-    return result
+        for (code, name), nav in zip(FUNDS, navs)
+    }
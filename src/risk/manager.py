@@ -2,14 +2,23 @@
 Risk Management — position sizing, performance metrics, and risk reporting.
 """
 
+import functools
 import logging
+import math
 from typing import Optional
 
 import numpy as np
 import pandas as pd
 
+from src.analysis.jit import njit
+
 logger = logging.getLogger(__name__)
 
+TRADING_DAYS = 252
+# Fewer returns than this get a zeroed risk_report (the statistics are
+# meaningless on a couple of points)
+MIN_RETURNS = 3
+
 
 def calc_position_size(
     capital: float,
@@ -24,8 +33,16 @@ def calc_position_size(
         risk_pct: fraction of capital to risk (e.g. 0.02 = 2%)
         stop_loss_pct: stop-loss distance as fraction (e.g. 0.05 = 5%)
 
-    Returns dict with risk_amount, position_size, stop_loss_pct.
+    Returns dict with risk_amount, position_size, stop_loss_pct. Results are
+    memoized per argument tuple; each call gets its own copy of the dict.
     """
+    return _position_size(capital, risk_pct, stop_loss_pct).copy()
+
+
+# typed: 100_000 and 100_000.0 must not share an entry, the dict echoes them back
+@functools.lru_cache(maxsize=128, typed=True)
+def _position_size(capital: float, risk_pct: float, stop_loss_pct: float) -> dict:
+    """Cached calc_position_size result; callers must not mutate it."""
     risk_amount = capital * risk_pct
     position_size = risk_amount / stop_loss_pct if stop_loss_pct > 0 else 0.0
     return {
@@ -37,16 +54,52 @@ def calc_position_size(
     }
 
 
+def _return_stats(returns: np.ndarray, rf_per_period: float) -> tuple[float, float, float, float]:
+    """Shared return statistics for the ratio calculations.
+
+    Returns (mean, sample std, mean excess return, downside deviation of the
+    excess returns); mean/std are NaN when there are too few returns, as in
+    pandas.
+    """
+    n = len(returns)
+    mean = float(returns.mean()) if n else np.nan
+    std = float(returns.std(ddof=1)) if n > 1 else np.nan
+    excess = returns - rf_per_period
+    downside = excess[excess < 0]
+    # dot() sums the squares without materializing downside**2
+    downside_std = math.sqrt(float(np.dot(downside, downside)) / len(downside)) if len(downside) > 0 else 0.0
+    return mean, std, mean - rf_per_period, downside_std
+
+
+@functools.lru_cache(maxsize=32)
+def _ann_factor(periods_per_year: int) -> float:
+    """Annualization multiplier sqrt(periods_per_year)."""
+    return math.sqrt(periods_per_year)
+
+
+def _sharpe_from_stats(std: float, excess_mean: float, annualizer: float) -> float:
+    """Annualized Sharpe ratio from _return_stats values."""
+    if std == 0:
+        return 0.0
+    return float(annualizer * excess_mean / std)
+
+
+def _sortino_from_stats(excess_mean: float, downside_std: float, annualizer: float) -> float:
+    """Annualized Sortino ratio from _return_stats values."""
+    if downside_std == 0:
+        return 0.0
+    return float(annualizer * excess_mean / downside_std)
+
+
 def calc_sharpe_ratio(
     returns: pd.Series,
     risk_free_rate: float = 0.05,
-    periods_per_year: int = 252,
+    periods_per_year: int = TRADING_DAYS,
 ) -> float:
     """Annualized Sharpe ratio."""
-    if returns.std() == 0:
-        return 0.0
-    excess = returns - risk_free_rate / periods_per_year
-    return float(np.sqrt(periods_per_year) * excess.mean() / excess.std())
+    rf_per_period = risk_free_rate / periods_per_year
+    mean, std, _, _ = _return_stats(returns.to_numpy(dtype=np.float64, copy=False), rf_per_period)
+    return _sharpe_from_stats(std, mean - rf_per_period, _ann_factor(periods_per_year))
 
 
 def calc_max_drawdown(prices: pd.Series) -> dict:
@@ -55,29 +108,104 @@ def calc_max_drawdown(prices: pd.Series) -> dict:
 
     Returns dict with max_drawdown (negative float), peak_date, trough_date.
     """
-    cummax = prices.cummax()
-    drawdown = (prices - cummax) / cummax
-    trough_idx = drawdown.idxmin()
-    peak_idx = prices.loc[:trough_idx].idxmax()
+    vals = prices.to_numpy(dtype=np.float64)
+    # fmax (not maximum) so a NaN price doesn't poison the running peak, as
+    # with Series.cummax(); the drawdown at NaN prices is NaN either way
+    cummax = np.fmax.accumulate(vals)
+    drawdown = (vals - cummax) / cummax
+    # Positional argmin/argmax; the peak is the highest price up to the trough
+    trough_i = int(np.nanargmin(drawdown))
+    peak_i = int(np.nanargmax(vals[:trough_i + 1]))
     return {
-        "max_drawdown": float(drawdown.min()),
-        "peak_date": str(peak_idx),
-        "trough_date": str(trough_idx),
+        "max_drawdown": float(drawdown[trough_i]),
+        "peak_date": str(prices.index[peak_i]),
+        "trough_date": str(prices.index[trough_i]),
     }
 
 
 def calc_sortino_ratio(
     returns: pd.Series,
     risk_free_rate: float = 0.05,
-    periods_per_year: int = 252,
+    periods_per_year: int = TRADING_DAYS,
 ) -> float:
     """Annualized Sortino ratio (downside deviation only)."""
-    excess = returns - risk_free_rate / periods_per_year
-    downside = excess[excess < 0]
-    downside_std = np.sqrt((downside**2).mean()) if len(downside) > 0 else 0.0
-    if downside_std == 0:
-        return 0.0
-    return float(np.sqrt(periods_per_year) * excess.mean() / downside_std)
+    rf_per_period = risk_free_rate / periods_per_year
+    mean, _, _, downside_std = _return_stats(returns.to_numpy(dtype=np.float64, copy=False), rf_per_period)
+    return _sortino_from_stats(mean - rf_per_period, downside_std, _ann_factor(periods_per_year))
+
+
+@njit(cache=True)
+def _risk_kernel(prices, rf_per_period):
+    """Return statistics and max drawdown of a price array in one pass.
+
+    Returns (n_returns, mean, std, downside_std, max_drawdown, peak_i,
+    trough_i) with the semantics of pct_change().dropna() fed through
+    _return_stats, and of calc_max_drawdown. NaN prices are skipped; peak_i
+    and trough_i are -1 when no drawdown value is defined.
+
+    Mean and variance are accumulated online as sums of the returns shifted
+    by the first return (the shifted-data variance algorithm), and the
+    downside sum only depends on the fixed risk-free rate, so no returns
+    buffer or second pass is needed.
+    """
+    n = len(prices)
+    n_ret = 0
+    shift = 0.0
+    sum_d = 0.0
+    sum_d2 = 0.0
+    down_ssq = 0.0
+    n_down = 0
+
+    run_max = np.nan
+    run_max_i = -1
+    max_dd = np.nan
+    peak_i = -1
+    trough_i = -1
+    for i in range(n):
+        v = prices[i]
+        if np.isnan(v):
+            continue
+        if i > 0 and not np.isnan(prices[i - 1]):
+            r = (v - prices[i - 1]) / prices[i - 1]
+            if not np.isnan(r):
+                if n_ret == 0:
+                    shift = r
+                n_ret += 1
+                d = r - shift
+                sum_d += d
+                sum_d2 += d * d
+                excess = r - rf_per_period
+                if excess < 0:
+                    down_ssq += excess * excess
+                    n_down += 1
+        if run_max_i < 0 or v > run_max:
+            run_max = v
+            run_max_i = i
+        dd = (v - run_max) / run_max
+        if not np.isnan(dd) and (trough_i < 0 or dd < max_dd):
+            max_dd = dd
+            trough_i = i
+            peak_i = run_max_i
+
+    mean = shift + sum_d / n_ret if n_ret > 0 else np.nan
+    std = math.sqrt(max(sum_d2 - sum_d * sum_d / n_ret, 0.0) / (n_ret - 1)) if n_ret > 1 else np.nan
+    downside_std = math.sqrt(down_ssq / n_down) if n_down > 0 else 0.0
+    return n_ret, mean, std, downside_std, max_dd, peak_i, trough_i
+
+
+def _short_series_report(n_returns: int) -> dict:
+    """risk_report result for a series with fewer than MIN_RETURNS returns."""
+    return {
+        "total_return": 0.0,
+        "annualized_return": 0.0,
+        "annualized_volatility": 0.0,
+        "sharpe_ratio": 0.0,
+        "sortino_ratio": 0.0,
+        "max_drawdown": {"max_drawdown": 0.0, "peak_date": None, "trough_date": None},
+        "daily_return_mean": 0.0,
+        "daily_return_std": 0.0,
+        "num_trading_days": n_returns,
+    }
 
 
 def risk_report(
@@ -87,7 +215,8 @@ def risk_report(
     """
     Generate a risk report for a portfolio.
 
-    Expects portfolio DataFrame with 'total_value' or 'Close' column.
+    Expects portfolio DataFrame with 'total_value' or 'Close' column. Series
+    with fewer than MIN_RETURNS returns get an all-zero report.
     """
     if "total_value" in portfolio.columns:
         prices = portfolio["total_value"]
@@ -96,15 +225,27 @@ def risk_report(
     else:
         prices = portfolio.iloc[:, 0]
 
-    returns = prices.pct_change().dropna()
+    # Returns statistics and drawdown come from one compiled pass
+    p = prices.to_numpy(dtype=np.float64)
+    rf_daily = risk_free_rate / TRADING_DAYS
+    annualizer = _ann_factor(TRADING_DAYS)
+    n_returns, mean, std, downside_std, max_dd, peak_i, trough_i = _risk_kernel(p, rf_daily)
+    if n_returns < MIN_RETURNS:
+        return _short_series_report(int(n_returns))
+    mean, std, downside_std = float(mean), float(std), float(downside_std)
+    excess_mean = mean - rf_daily
 
-    sharpe = calc_sharpe_ratio(returns, risk_free_rate)
-    sortino = calc_sortino_ratio(returns, risk_free_rate)
-    dd = calc_max_drawdown(prices)
+    sharpe = _sharpe_from_stats(std, excess_mean, annualizer)
+    sortino = _sortino_from_stats(excess_mean, downside_std, annualizer)
+    dd = {
+        "max_drawdown": float(max_dd),
+        "peak_date": str(prices.index[peak_i]),
+        "trough_date": str(prices.index[trough_i]),
+    }
 
-    total_return = (prices.iloc[-1] / prices.iloc[0]) - 1
-    ann_return = (1 + total_return) ** (252 / len(prices)) - 1 if len(prices) > 1 else 0.0
-    ann_vol = float(returns.std() * np.sqrt(252))
+    total_return = (p[-1] / p[0]) - 1
+    ann_return = (1 + total_return) ** (TRADING_DAYS / len(prices)) - 1 if len(prices) > 1 else 0.0
+    ann_vol = float(std * annualizer)
 
     return {
         "total_return": float(total_return),
@@ -113,7 +254,94 @@ def risk_report(
         "sharpe_ratio": sharpe,
         "sortino_ratio": sortino,
         "max_drawdown": dd,
-        "daily_return_mean": float(returns.mean()),
-        "daily_return_std": float(returns.std()),
-        "num_trading_days": len(returns),
+        "daily_return_mean": mean,
+        "daily_return_std": std,
+        "num_trading_days": int(n_returns),
     }
+
+
+def risk_report_batch(
+    prices: pd.DataFrame,
+    risk_free_rate: float = 0.05,
+) -> pd.DataFrame:
+    """
+    risk_report for every column of a price DataFrame at once.
+
+    Each column is one portfolio or ticker. The statistics are computed with
+    column-wise NumPy reductions over the whole (bars x columns) matrix
+    instead of one risk_report call per column; NaN prices are skipped the
+    same way.
+
+    Returns a DataFrame indexed by column with the risk_report keys as
+    columns; the max_drawdown dict is flattened into max_drawdown,
+    peak_date and trough_date.
+    """
+    p = prices.to_numpy(dtype=np.float64)
+    if len(p) == 0:
+        # No bars: every column is a zeroed short series
+        p = np.full((1, p.shape[1]), np.nan)
+        prices = pd.DataFrame(p, index=pd.Index([None]), columns=prices.columns)
+    n_bars, n_cols = p.shape
+    rf_daily = risk_free_rate / TRADING_DAYS
+    annualizer = _ann_factor(TRADING_DAYS)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = (p[1:] - p[:-1]) / p[:-1]
+        valid = ~np.isnan(returns)
+        n_returns = valid.sum(axis=0)
+        r = np.where(valid, returns, 0.0)
+        mean = r.sum(axis=0) / n_returns
+        dev = np.where(valid, returns - mean, 0.0)
+        std = np.sqrt((dev * dev).sum(axis=0) / (n_returns - 1))
+        excess = returns - rf_daily
+        down = valid & (excess < 0)
+        n_down = down.sum(axis=0)
+        down_sq = np.where(down, excess * excess, 0.0).sum(axis=0)
+        downside_std = np.where(n_down > 0, np.sqrt(down_sq / n_down), 0.0)
+
+        excess_mean = mean - rf_daily
+        sharpe = np.where(std == 0, 0.0, annualizer * excess_mean / std)
+        sortino = np.where(downside_std == 0, 0.0, annualizer * excess_mean / downside_std)
+
+        # Drawdown: running peak skipping NaNs, trough = first minimum, peak =
+        # first maximum price at or before the trough
+        cummax = np.fmax.accumulate(p, axis=0)
+        drawdown = (p - cummax) / cummax
+        drawdown_filled = np.where(np.isnan(drawdown), np.inf, drawdown)
+        trough_i = drawdown_filled.argmin(axis=0)
+        rows = np.arange(n_bars)[:, None]
+        prefix = np.where((rows <= trough_i) & ~np.isnan(p), p, -np.inf)
+        peak_i = prefix.argmax(axis=0)
+        max_dd = drawdown_filled[trough_i, np.arange(n_cols)]
+
+        total_return = p[-1] / p[0] - 1
+        ann_return = (1 + total_return) ** (TRADING_DAYS / n_bars) - 1 if n_bars > 1 else np.zeros(n_cols)
+
+    index = prices.index
+    out = pd.DataFrame(
+        {
+            "total_return": total_return,
+            "annualized_return": ann_return,
+            "annualized_volatility": std * annualizer,
+            "sharpe_ratio": sharpe,
+            "sortino_ratio": sortino,
+            "max_drawdown": max_dd,
+            "peak_date": [str(index[i]) for i in peak_i],
+            "trough_date": [str(index[i]) for i in trough_i],
+            "daily_return_mean": mean,
+            "daily_return_std": std,
+            "num_trading_days": n_returns,
+        },
+        index=prices.columns,
+    )
+
+    # Same zeroed report as risk_report for series that are too short
+    short = n_returns < MIN_RETURNS
+    if short.any():
+        numeric = [c for c in out.columns if c not in ("peak_date", "trough_date", "num_trading_days")]
+        out.loc[short, numeric] = 0.0
+        # object dtype so the dates stay None rather than becoming string NaN
+        dates = ["peak_date", "trough_date"]
+        out[dates] = out[dates].astype(object)
+        out.loc[short, dates] = None
+    return out
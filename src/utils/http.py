@@ -0,0 +1,32 @@
+"""Shared HTTP session for the REST data sources."""
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+HEADERS = {"User-Agent": "Mozilla/5.0 (SENTINEL-v2)"}
+TIMEOUT = 15
+
+# Keep-alive connections are pooled per host, so repeated calls to the same
+# API (CoinGecko, Google News, ...) skip the TCP/TLS handshake. Throttling and
+# gateway errors are retried with a short backoff; Retry-After is not honoured
+# so a rate-limited source cannot stall a report for minutes.
+_RETRY = Retry(
+    total=3,
+    backoff_factor=0.3,
+    status_forcelist=(429, 502, 503, 504),
+    allowed_methods=("GET",),
+    respect_retry_after_header=False,
+)
+
+SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=_RETRY)
+SESSION.mount("https://", _adapter)
+SESSION.mount("http://", _adapter)
+
+
+def http_get(url: str, **kwargs) -> requests.Response:
+    """``SESSION.get`` with the default headers and timeout filled in."""
+    kwargs.setdefault("headers", HEADERS)
+    kwargs.setdefault("timeout", TIMEOUT)
+    return SESSION.get(url, **kwargs)
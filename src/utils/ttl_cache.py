@@ -0,0 +1,49 @@
+"""Small time-based memoization for network fetchers."""
+
+import functools
+import threading
+import time
+
+
+def ttl_cache(ttl: float, maxsize: int = 64):
+    """Cache a function's results per positional-argument tuple for ``ttl`` seconds.
+
+    ``None`` results (the fetchers' failure value) are not cached, so a
+    failed request is retried on the next call. Cached values are shared
+    between callers and must not be mutated. The wrapper exposes
+    ``cache_clear()`` like ``functools.lru_cache``, and ``cache_discard(*args)``
+    to drop a single entry.
+    """
+    def decorator(fn):
+        cache: dict = {}
+        lock = threading.Lock()
+
+        @functools.wraps(fn)
+        def wrapper(*args):
+            now = time.monotonic()
+            with lock:
+                hit = cache.get(args)
+            if hit is not None and now - hit[0] < ttl:
+                return hit[1]
+
+            value = fn(*args)
+            if value is not None:
+                with lock:
+                    if len(cache) >= maxsize and args not in cache:
+                        cache.pop(next(iter(cache)))  # evict the oldest entry
+                    cache[args] = (now, value)
+            return value
+
+        def cache_clear():
+            with lock:
+                cache.clear()
+
+        def cache_discard(*args):
+            with lock:
+                cache.pop(args, None)
+
+        wrapper.cache_clear = cache_clear
+        wrapper.cache_discard = cache_discard
+        return wrapper
+
+    return decorator